@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import semana11
+
+# Palabras para generar nombres de productos sintéticos
+PALABRAS = ["arroz", "azucar", "leche", "queso", "pan", "harina", "aceite", "atun", "cafe", "te",
+            "galleta", "jabon", "fideo", "sal", "avena", "yogur", "jugo", "agua", "huevo", "pollo"]
+MARCAS = ["norte", "sol", "andino", "costa", "valle", "premium", "casero", "real"]
+
+
+def preparar_archivos(carpeta: str, tamano: int, semilla: int, formato: str) -> str:
+    # Crea el archivo del inventario y su instantánea, y devuelve la ruta del archivo
+    aleatorio = random.Random(semilla)
+    inventario = semana11.Inventario()
+    inventario.agregar_en_bloque([
+        semana11.Producto(f"P{i:010d}",
+                          f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 9999)}",
+                          aleatorio.randint(0, 500), round(aleatorio.uniform(0.1, 100), 2))
+        for i in range(tamano)])
+    ruta = os.path.join(carpeta, f"inventario_{tamano}.json")
+    inventario.guardar_en_archivo(ruta, formato)
+    inventario.guardar_snapshot(ruta + ".snap")
+    return ruta
+
+
+def medir_en_proceso(modo: str, ruta: str):
+    # Se ejecuta en un proceso nuevo: mide desde la importación de semana11 hasta tener el
+    # inventario cargado, que es lo que tarda en arrancar SistemaInventario
+    inicio = time.perf_counter()
+    import semana11 as modulo
+    inventario = modulo.Inventario()
+    if modo == "snapshot":
+        cargado = inventario.cargar_snapshot(ruta + ".snap")
+    else:
+        cargado = inventario.cargar_desde_archivo(ruta)
+    transcurrido = time.perf_counter() - inicio
+    if not cargado:
+        sys.exit(1)
+    print(transcurrido)
+
+
+def arranque_en_frio(modo: str, ruta: str, repeticiones: int) -> float:
+    # Devuelve el mejor tiempo de carga, cada vez en un intérprete nuevo
+    tiempos = []
+    for _ in range(repeticiones):
+        resultado = subprocess.run([sys.executable, os.path.abspath(__file__), "--medir", modo, ruta],
+                                   capture_output=True, text=True, check=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        tiempos.append(float(resultado.stdout.strip().splitlines()[-1]))
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío de semana11: archivo JSON frente a instantánea")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--formato", choices=["json", "ndjson"], default="json")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--medir", nargs=2, metavar=("MODO", "RUTA"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir_en_proceso(*args.medir)
+        return
+
+    print(f"{'productos':>10} {args.formato + ' (s)':>10} {'snapshot (s)':>13} {'aceleración':>12}")
+    for tamano in args.tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = preparar_archivos(carpeta, tamano, args.semilla, args.formato)
+            desde_archivo = arranque_en_frio("archivo", ruta, args.repeticiones)
+            desde_snapshot = arranque_en_frio("snapshot", ruta, args.repeticiones)
+        print(f"{tamano:>10} {desde_archivo:>10.2f} {desde_snapshot:>13.2f} {desde_archivo / desde_snapshot:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from semana09 import Inventario, Producto
+
+# Palabras para generar nombres de productos sintéticos
+PALABRAS = ["arroz", "azucar", "leche", "queso", "pan", "harina", "aceite", "atun", "cafe", "te",
+            "galleta", "jabon", "fideo", "sal", "avena", "yogur", "jugo", "agua", "huevo", "pollo"]
+MARCAS = ["norte", "sol", "andino", "costa", "valle", "premium", "casero", "real"]
+
+
+def generar_nombre(aleatorio: random.Random) -> str:
+    # Combina palabras al azar para que haya nombres repetidos y coincidencias parciales
+    return f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 9999)}"
+
+
+def crear_inventario(tamano: int, usar_indice: bool, semilla: int) -> Inventario:
+    # Llena un inventario de semana09 sin mostrar los mensajes de cada producto agregado
+    aleatorio = random.Random(semilla)
+    inventario = Inventario(usar_indice=usar_indice)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for id_producto in range(1, tamano + 1):
+            inventario.agregar_producto(Producto(id_producto, generar_nombre(aleatorio), 10, 1.0))
+    return inventario
+
+
+def medir_busquedas(inventario: Inventario, consultas: list, repeticiones: int) -> float:
+    # Devuelve la latencia media por búsqueda en milisegundos
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for consulta in consultas:
+            inventario.encontrar_productos(consulta)
+    return (time.perf_counter() - inicio) * 1000 / (repeticiones * len(consultas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de búsqueda por nombre con y sin índice de trigramas")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="tamaños de catálogo a medir (por ejemplo 1000 10000 100000 1000000)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    # Consultas selectivas (pocos resultados), amplias (muchos resultados) y cortas (menos de 3 caracteres,
+    # que el índice resuelve recorriendo los nombres)
+    grupos = {
+        "selectivas": ["queso valle 12", "premium 7", "atun costa 45"],
+        "amplias": ["harina", "cafe"],
+        "cortas": ["te", "so"],
+    }
+    print(f"{'productos':>10} {'consultas':>11} {'lineal (ms)':>12} {'índice (ms)':>12} {'aceleración':>12}")
+    for tamano in args.tamanos:
+        sin_indice = crear_inventario(tamano, False, args.semilla)
+        tiempos_lineal = {grupo: medir_busquedas(sin_indice, consultas, args.repeticiones)
+                          for grupo, consultas in grupos.items()}
+        del sin_indice
+        con_indice = crear_inventario(tamano, True, args.semilla)
+        tiempos_indice = {grupo: medir_busquedas(con_indice, consultas, args.repeticiones)
+                          for grupo, consultas in grupos.items()}
+        del con_indice
+        for grupo in grupos:
+            lineal, indice = tiempos_lineal[grupo], tiempos_indice[grupo]
+            print(f"{tamano:>10} {grupo:>11} {lineal:>12.3f} {indice:>12.3f} {lineal / indice:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
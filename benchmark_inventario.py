@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import semana09
+import semana10
+import semana11
+
+# Palabras para generar nombres de productos sintéticos
+PALABRAS = ["arroz", "azucar", "leche", "queso", "pan", "harina", "aceite", "atun", "cafe", "te",
+            "galleta", "jabon", "fideo", "sal", "avena", "yogur", "jugo", "agua", "huevo", "pollo"]
+MARCAS = ["norte", "sol", "andino", "costa", "valle", "premium", "casero", "real"]
+CONSULTAS = ["queso valle", "harina", "premium 7", "cafe sol 12", "te"]
+
+
+class AdaptadorSemana09:
+    # Inventario en memoria de semana09 (no tiene persistencia, así que no hay guardar ni cargar)
+    nombre = "semana09"
+
+    def __init__(self, carpeta: str):
+        self.inventario = semana09.Inventario()
+
+    def agregar(self, id_producto, nombre, cantidad, precio):
+        self.inventario.agregar_producto(semana09.Producto(id_producto, nombre, cantidad, precio))
+
+    def eliminar(self, id_producto):
+        self.inventario.eliminar_producto(id_producto)
+
+    def actualizar(self, id_producto, cantidad, precio):
+        self.inventario.actualizar_producto(id_producto, cantidad, precio)
+
+    def buscar(self, texto):
+        self.inventario.buscar_producto(texto)
+
+    def listar(self):
+        self.inventario.mostrar_productos()
+
+    guardar = None
+    cargar = None
+
+
+class AdaptadorSemana10:
+    # Inventario de semana10 con archivo de texto en modo diario (sin él, cada alta reescribe todo el
+    # archivo y una carga de un millón de productos no termina en un tiempo razonable)
+    nombre = "semana10"
+    formato = "texto"
+
+    def __init__(self, carpeta: str):
+        extension = "bin" if self.formato == "binario" else "txt"
+        self.archivo = os.path.join(carpeta, f"inventario_{self.nombre}.{extension}")
+        self.inventario = self.abrir()
+
+    def abrir(self):
+        return semana10.Inventario(self.archivo, modo_diario=True, limite_diario=10 ** 12, formato=self.formato)
+
+    def agregar(self, id_producto, nombre, cantidad, precio):
+        self.inventario.agregar_producto(semana10.Producto(id_producto, nombre, cantidad, precio))
+
+    def eliminar(self, id_producto):
+        self.inventario.eliminar_producto(id_producto)
+
+    def actualizar(self, id_producto, cantidad, precio):
+        self.inventario.actualizar_producto(id_producto, cantidad, precio)
+
+    def buscar(self, texto):
+        self.inventario.buscar_producto(texto)
+
+    def listar(self):
+        self.inventario.mostrar_productos()
+
+    def guardar(self):
+        self.inventario.guardar_inventario()
+
+    def cargar(self):
+        self.inventario = self.abrir()
+
+
+class AdaptadorSemana10Binario(AdaptadorSemana10):
+    # Inventario de semana10 con el archivo binario de registros de tamaño fijo
+    nombre = "semana10-binario"
+    formato = "binario"
+
+
+class AdaptadorSemana11:
+    # Inventario de semana11 con persistencia JSON explícita
+    nombre = "semana11"
+
+    def __init__(self, carpeta: str):
+        self.archivo = os.path.join(carpeta, "inventario_semana11.json")
+        self.inventario = semana11.Inventario()
+
+    def agregar(self, id_producto, nombre, cantidad, precio):
+        self.inventario.agregar_producto(semana11.Producto(f"P{id_producto}", nombre, cantidad, precio))
+
+    def eliminar(self, id_producto):
+        self.inventario.eliminar_producto(f"P{id_producto}")
+
+    def actualizar(self, id_producto, cantidad, precio):
+        self.inventario.actualizar_cantidad(f"P{id_producto}", cantidad)
+        self.inventario.actualizar_precio(f"P{id_producto}", precio)
+
+    def buscar(self, texto):
+        for producto in self.inventario.buscar_por_nombre(texto):
+            print(producto)
+
+    def listar(self):
+        for producto in self.inventario.listar_productos():
+            print(producto)
+
+    def guardar(self):
+        self.inventario.guardar_en_archivo(self.archivo)
+
+    def cargar(self):
+        self.inventario = semana11.Inventario()
+        self.inventario.cargar_desde_archivo(self.archivo)
+
+
+ADAPTADORES = [AdaptadorSemana09, AdaptadorSemana10, AdaptadorSemana10Binario, AdaptadorSemana11]
+
+
+def generar_catalogo(tamano: int, semilla: int) -> list:
+    # Genera filas (id, nombre, cantidad, precio) reproducibles para todas las implementaciones
+    aleatorio = random.Random(semilla)
+    return [(i, f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 9999)}",
+             aleatorio.randint(0, 500), round(aleatorio.uniform(0.1, 100), 2))
+            for i in range(1, tamano + 1)]
+
+
+def ejecutar(clase, catalogo: list, muestra: list, carpeta: str) -> dict:
+    # Ejecuta las operaciones en orden y devuelve el tiempo en segundos de cada una.
+    # Los mensajes que imprimen los inventarios se descartan para medir solo el trabajo del inventario.
+    tiempos = {}
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        inicio = time.perf_counter()
+        adaptador = clase(carpeta)
+        for fila in catalogo:
+            adaptador.agregar(*fila)
+        tiempos["agregar"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for id_producto in muestra:
+            adaptador.actualizar(id_producto, 7, 9.99)
+        tiempos["actualizar"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for consulta in CONSULTAS:
+            adaptador.buscar(consulta)
+        tiempos["buscar"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        adaptador.listar()
+        tiempos["listar"] = time.perf_counter() - inicio
+
+        if clase.guardar is not None:
+            inicio = time.perf_counter()
+            adaptador.guardar()
+            tiempos["guardar"] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            adaptador.cargar()
+            tiempos["cargar"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for id_producto in muestra:
+            adaptador.eliminar(id_producto)
+        tiempos["eliminar"] = time.perf_counter() - inicio
+    return tiempos
+
+
+def medir_memoria(clase, catalogo: list, muestra: list) -> int:
+    # Repite las operaciones con tracemalloc activo (en otra pasada para no distorsionar los tiempos)
+    # y devuelve el pico de memoria reservada en bytes
+    with tempfile.TemporaryDirectory() as carpeta:
+        tracemalloc.start()
+        try:
+            ejecutar(clase, catalogo, muestra, carpeta)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el rendimiento de los inventarios de semana09, 10 y 11")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--implementaciones", nargs="+", default=[clase.nombre for clase in ADAPTADORES],
+                        choices=[clase.nombre for clase in ADAPTADORES])
+    parser.add_argument("--muestra", type=int, default=1000,
+                        help="productos que se actualizan y eliminan en cada medición")
+    parser.add_argument("--sin-memoria", action="store_true", help="omite la pasada que mide el pico de memoria")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto se escribe en la consola)")
+    args = parser.parse_args()
+
+    resultados = []
+    for tamano in args.tamanos:
+        catalogo = generar_catalogo(tamano, args.semilla)
+        muestra = random.Random(args.semilla).sample(range(1, tamano + 1), min(args.muestra, tamano))
+        for clase in ADAPTADORES:
+            if clase.nombre not in args.implementaciones:
+                continue
+            print(f"Midiendo {clase.nombre} con {tamano} productos...", file=sys.stderr)
+            with tempfile.TemporaryDirectory() as carpeta:
+                tiempos = ejecutar(clase, catalogo, muestra, carpeta)
+            resultados.append({
+                "implementacion": clase.nombre,
+                "productos": tamano,
+                "muestra": len(muestra),
+                "tiempos_s": tiempos,
+                "memoria_pico_bytes": None if args.sin_memoria else medir_memoria(clase, catalogo, muestra),
+            })
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=4, ensure_ascii=False)
+    else:
+        print(json.dumps(informe, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
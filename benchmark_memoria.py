@@ -0,0 +1,102 @@
+import argparse
+import gc
+import random
+import tracemalloc
+
+import semana11
+
+# Palabras para generar nombres de productos sintéticos
+PALABRAS = ["arroz", "azucar", "leche", "queso", "pan", "harina", "aceite", "atun", "cafe", "te",
+            "galleta", "jabon", "fideo", "sal", "avena", "yogur", "jugo", "agua", "huevo", "pollo"]
+MARCAS = ["norte", "sol", "andino", "costa", "valle", "premium", "casero", "real"]
+
+
+class ProductoAnterior:
+    # Copia de la representación anterior de semana11.Producto: atributos en un __dict__ por
+    # instancia y nombres sin internar (cada producto guarda su propia copia del texto)
+    def __init__(self, id, nombre, cantidad, precio):
+        self._id = id
+        self._nombre = nombre
+        self._cantidad = cantidad
+        self._precio = precio
+        self._observador = None
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def nombre(self):
+        return self._nombre
+
+    @property
+    def cantidad(self):
+        return self._cantidad
+
+    @property
+    def precio(self):
+        return self._precio
+
+
+def generar_filas(tamano: int, semilla: int):
+    # Genera las filas de a una, para que los textos se creen mientras se mide la memoria.
+    # Hay pocos nombres distintos repetidos muchas veces, como en un catálogo real.
+    aleatorio = random.Random(semilla)
+    for i in range(tamano):
+        nombre = f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 500)}"
+        yield f"P{i:010d}", nombre, aleatorio.randint(0, 500), round(aleatorio.uniform(0.1, 100), 2)
+
+
+def construir_anterior(tamano: int, semilla: int):
+    # Inventario con la estructura anterior: productos con __dict__, un conjunto aparte con
+    # los IDs usados y un método enlazado distinto como observador de cada producto
+    inventario = semana11.Inventario()
+    for fila in generar_filas(tamano, semilla):
+        producto = ProductoAnterior(*fila)
+        inventario.agregar_producto(producto)
+        producto._observador = inventario.producto_modificado
+    inventario._ids_usados = set(inventario._productos)
+    inventario.limpiar_cambios()
+    return inventario
+
+
+def construir_actual(tamano: int, semilla: int):
+    # Inventario con la estructura actual de semana11
+    inventario = semana11.Inventario()
+    for fila in generar_filas(tamano, semilla):
+        inventario.agregar_producto(semana11.Producto(*fila))
+    # Como después de cargar un archivo, sin cambios pendientes de guardar
+    inventario.limpiar_cambios()
+    return inventario
+
+
+def medir(construir, tamano: int, semilla: int) -> int:
+    # Devuelve los bytes que siguen reservados después de construir el inventario
+    gc.collect()
+    tracemalloc.start()
+    try:
+        inicial = tracemalloc.get_traced_memory()[0]
+        inventario = construir(tamano, semilla)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - inicial
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por producto del inventario de semana11, antes y después "
+                                                 "de usar __slots__, nombres internados y quitar el conjunto de IDs")
+    parser.add_argument("--tamano", type=int, default=1_000_000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    antes = medir(construir_anterior, args.tamano, args.semilla)
+    despues = medir(construir_actual, args.tamano, args.semilla)
+    print(f"{'estructura':>10} {'total (MB)':>12} {'bytes/producto':>15}")
+    for etiqueta, total in (("antes", antes), ("después", despues)):
+        print(f"{etiqueta:>10} {total / 2 ** 20:>12.1f} {total / args.tamano:>15.1f}")
+    print(f"Ahorro: {(1 - despues / antes) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
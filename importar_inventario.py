@@ -0,0 +1,197 @@
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+
+from semana11 import Inventario, Producto
+
+# Extensiones reconocidas para deducir el formato de entrada
+FORMATOS_POR_EXTENSION = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def deducir_formato(ruta: str) -> str:
+    # Devuelve el formato según la extensión del archivo, o None si no se reconoce
+    for extension, formato in FORMATOS_POR_EXTENSION.items():
+        if ruta.lower().endswith(extension):
+            return formato
+    return None
+
+
+def leer_filas(entrada, formato: str):
+    # Genera (número de línea, fila, motivo de error) leyendo la entrada de a una fila.
+    # Si la línea no se pudo interpretar, la fila es el texto original y el motivo explica el error.
+    if formato == "csv":
+        lector = csv.DictReader(entrada)
+        for fila in lector:
+            if None in fila:
+                yield lector.line_num, fila, "La fila tiene más columnas que el encabezado"
+            else:
+                yield lector.line_num, fila, None
+    else:
+        for numero, linea in enumerate(entrada, 1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, linea.rstrip("\n"), f"JSON inválido: {e}"
+                continue
+            if isinstance(fila, dict):
+                yield numero, fila, None
+            else:
+                yield numero, fila, "La línea no es un objeto JSON"
+
+
+def validar_fila(fila: dict) -> tuple:
+    # Devuelve (id, nombre, cantidad, precio) o lanza ValueError con el motivo del rechazo.
+    # El ID es opcional: si falta o está vacío se devuelve None y se genera uno al importar.
+    id_producto = fila.get("id")
+    if id_producto is not None:
+        id_producto = str(id_producto).strip() or None
+
+    nombre = fila.get("nombre")
+    if not isinstance(nombre, str) or not nombre.strip():
+        raise ValueError("Falta el nombre")
+
+    cantidad = fila.get("cantidad")
+    if isinstance(cantidad, (bool, float)) or cantidad is None:
+        raise ValueError(f"Cantidad inválida: {cantidad!r}")
+    try:
+        cantidad = int(cantidad)
+    except (TypeError, ValueError):
+        raise ValueError(f"Cantidad inválida: {cantidad!r}") from None
+    if cantidad < 0:
+        raise ValueError("La cantidad no puede ser negativa")
+
+    precio = fila.get("precio")
+    if isinstance(precio, bool) or precio is None:
+        raise ValueError(f"Precio inválido: {precio!r}")
+    try:
+        precio = float(precio)
+    except (TypeError, ValueError):
+        raise ValueError(f"Precio inválido: {precio!r}") from None
+    if not math.isfinite(precio) or precio <= 0:
+        raise ValueError("El precio debe ser mayor que cero")
+
+    return id_producto, nombre.strip(), cantidad, precio
+
+
+class Importador:
+    # Importa filas validadas al inventario por lotes y anota las rechazadas en un archivo aparte.
+    # Solo se guarda en memoria el lote en curso, además del propio inventario.
+
+    def __init__(self, inventario: Inventario, rechazados, tamano_lote: int):
+        self.inventario = inventario
+        self.rechazados = rechazados  # Archivo NDJSON con una línea por fila rechazada
+        self.tamano_lote = tamano_lote
+        self.leidas = 0
+        self.aceptadas = 0
+        self.rechazadas = 0
+        self.lote = []  # Filas válidas pendientes: (número de línea, id, nombre, cantidad, precio)
+
+    def rechazar(self, numero: int, fila, motivo: str):
+        self.rechazadas += 1
+        self.rechazados.write(json.dumps({"linea": numero, "motivo": motivo, "fila": fila}, ensure_ascii=False))
+        self.rechazados.write("\n")
+
+    def procesar(self, numero: int, fila, error: str):
+        self.leidas += 1
+        if error is not None:
+            self.rechazar(numero, fila, error)
+            return
+        try:
+            self.lote.append((numero, *validar_fila(fila)))
+        except ValueError as e:
+            self.rechazar(numero, fila, str(e))
+            return
+        if len(self.lote) >= self.tamano_lote:
+            self.vaciar_lote()
+
+    def vaciar_lote(self):
+        # Genera de una vez los IDs que faltan y agrega el lote completo al inventario
+        if not self.lote:
+            return
+        faltantes = sum(1 for fila in self.lote if fila[1] is None)
+        ids_nuevos = iter(self.inventario.reservar_ids(faltantes)) if faltantes else None
+        filas = []  # (número de línea, producto) en el orden de la entrada
+        for numero, id_producto, nombre, cantidad, precio in self.lote:
+            if id_producto is None:
+                id_producto = next(ids_nuevos)
+            filas.append((numero, Producto(id_producto, nombre, cantidad, precio)))
+        duplicados = self.inventario.agregar_en_bloque([producto for _, producto in filas])
+        # Se reconoce cada rechazado por el objeto y no por el ID: si el ID se repite en el lote,
+        # la primera aparición es la que se agregó y cada repetición conserva su propia línea
+        rechazados = {id(producto) for producto in duplicados}
+        for numero, producto in filas:
+            if id(producto) in rechazados:
+                self.rechazar(numero, producto.to_dict(), f"El ID {producto.id} ya existe")
+        self.aceptadas += len(filas) - len(duplicados)
+        self.lote = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa productos desde CSV o NDJSON al inventario de semana11")
+    parser.add_argument("entrada", help="archivo a importar, o - para leer de la entrada estándar")
+    parser.add_argument("--formato", choices=["csv", "ndjson"],
+                        help="formato de la entrada (por defecto se deduce de la extensión)")
+    parser.add_argument("--inventario", default="inventario.json", help="archivo del inventario de destino")
+    parser.add_argument("--rechazados", help="archivo NDJSON para las filas rechazadas "
+                                             "(por defecto, el de entrada con la extensión .rechazados.ndjson)")
+    parser.add_argument("--lote", type=int, default=10_000, help="filas que se validan y agregan juntas")
+    parser.add_argument("--progreso", type=int, default=100_000, help="filas entre cada aviso de progreso")
+    args = parser.parse_args()
+
+    formato = args.formato or (None if args.entrada == "-" else deducir_formato(args.entrada))
+    if formato is None:
+        parser.error("no se pudo deducir el formato de la entrada; indíquelo con --formato")
+    ruta_rechazados = args.rechazados or ("rechazados.ndjson" if args.entrada == "-"
+                                          else args.entrada + ".rechazados.ndjson")
+
+    inventario = Inventario()
+    if not inventario.cargar_desde_archivo(args.inventario):
+        sys.exit(1)
+    # Los cambios que quedaron sin guardar en el WAL se rehacen antes de importar: si no, el
+    # próximo inicio de SistemaInventario los rehacería encima de las filas importadas. El WAL
+    # queda abierto solo para vaciarlo al guardar; las filas importadas no se anotan en él
+    recuperados = inventario.recuperar_wal(args.inventario)
+    if recuperados:
+        print(f"Se recuperaron {recuperados} cambios sin guardar del registro {args.inventario}.wal",
+              file=sys.stderr)
+    inventario.activar_wal(args.inventario)
+
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, "r", encoding="utf-8", newline="")
+    inicio = time.perf_counter()
+    try:
+        with open(ruta_rechazados, "w", encoding="utf-8") as rechazados, inventario.wal_suspendido():
+            importador = Importador(inventario, rechazados, args.lote)
+            siguiente_aviso = args.progreso
+            for numero, fila, error in leer_filas(entrada, formato):
+                importador.procesar(numero, fila, error)
+                if importador.leidas >= siguiente_aviso:
+                    transcurrido = time.perf_counter() - inicio
+                    print(f"{importador.leidas} filas leídas, {importador.aceptadas} importadas, "
+                          f"{importador.rechazadas} rechazadas ({importador.leidas / transcurrido:,.0f} filas/s)",
+                          file=sys.stderr)
+                    siguiente_aviso += args.progreso
+            importador.vaciar_lote()
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    transcurrido = time.perf_counter() - inicio
+
+    print(f"Importación terminada: {importador.leidas} filas leídas, {importador.aceptadas} importadas, "
+          f"{importador.rechazadas} rechazadas en {transcurrido:.2f} s "
+          f"({importador.leidas / max(transcurrido, 1e-9):,.0f} filas/s)", file=sys.stderr)
+    if importador.rechazadas:
+        print(f"Las filas rechazadas están en '{ruta_rechazados}'.", file=sys.stderr)
+
+    guardado = inventario.guardar_cambios(args.inventario)
+    inventario.cerrar_wal()
+    if not guardado:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+class IndiceTrigramas:
+    # Índice de subcadenas para nombres de productos.
+    # Cada nombre se descompone en trigramas (grupos de 3 caracteres consecutivos) y para cada
+    # trigrama se guarda el conjunto de IDs cuyo nombre lo contiene. Una búsqueda intersecta los
+    # conjuntos de los trigramas del texto buscado y solo verifica esos pocos candidatos.
+    # Las claves suelen ser IDs de producto, pero puede ser cualquier valor hashable
+    # (semana11 indexa directamente los nombres distintos).
+    def __init__(self):
+        self.trigramas = {}  # Trigrama -> conjunto de IDs cuyo nombre contiene ese trigrama
+        self.nombres = {}    # ID -> nombre en minúsculas, para verificar candidatos y poder desindexar
+
+    @staticmethod
+    def obtener_trigramas(texto: str) -> set:
+        # Devuelve el conjunto de trigramas de un texto (vacío si tiene menos de 3 caracteres)
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    def agregar(self, id_producto, nombre: str):
+        # Indexa el nombre de un producto
+        nombre = nombre.lower()
+        self.nombres[id_producto] = nombre
+        for trigrama in self.obtener_trigramas(nombre):
+            ids = self.trigramas.get(trigrama)
+            if ids is None:
+                self.trigramas[trigrama] = {id_producto}
+            else:
+                ids.add(id_producto)
+
+    def eliminar(self, id_producto):
+        # Quita un producto del índice; los trigramas que quedan sin IDs se eliminan
+        nombre = self.nombres.pop(id_producto, None)
+        if nombre is None:
+            return
+        for trigrama in self.obtener_trigramas(nombre):
+            ids = self.trigramas[trigrama]
+            ids.discard(id_producto)
+            if not ids:
+                del self.trigramas[trigrama]
+
+    def renombrar(self, id_producto, nuevo_nombre: str):
+        # Actualiza el índice cuando cambia el nombre de un producto
+        self.eliminar(id_producto)
+        self.agregar(id_producto, nuevo_nombre)
+
+    def reconstruir(self, pares):
+        # Vuelve a crear el índice completo a partir de pares (id, nombre)
+        self.trigramas.clear()
+        self.nombres.clear()
+        for id_producto, nombre in pares:
+            self.agregar(id_producto, nombre)
+
+    def candidatos(self, texto: str):
+        # Genera, sin un orden particular, las claves cuyo nombre contiene el texto (sin distinguir mayúsculas)
+        texto = texto.lower()
+        trigramas = self.obtener_trigramas(texto)
+        if not trigramas:
+            # Con menos de 3 caracteres no hay trigramas: se recorre la lista de nombres
+            return (id_producto for id_producto, nombre in self.nombres.items() if texto in nombre)
+        # Se intersecta empezando por el conjunto más pequeño para reducir el trabajo
+        conjuntos = sorted((self.trigramas.get(trigrama, set()) for trigrama in trigramas), key=len)
+        candidatos = set(conjuntos[0])
+        for ids in conjuntos[1:]:
+            if not candidatos:
+                break
+            candidatos &= ids
+        # Tener todos los trigramas no garantiza la subcadena completa, así que se verifica cada candidato
+        return (id_producto for id_producto in candidatos if texto in self.nombres[id_producto])
+
+    def buscar(self, texto: str) -> list:
+        # Devuelve los IDs cuyo nombre contiene el texto (sin distinguir mayúsculas), en orden de ID
+        return sorted(self.candidatos(texto))
@@ -0,0 +1,119 @@
+import bisect
+from itertools import islice
+
+
+class ListaOrdenada:
+    # Lista que se mantiene ordenada con inserciones y eliminaciones baratas.
+    # Los valores se reparten en tramos ordenados de entre CARGA / 2 y 2 * CARGA elementos, y se
+    # guarda el máximo de cada tramo. Insertar o quitar busca el tramo con bisect sobre los
+    # máximos y solo desplaza los elementos de ese tramo, así que cuesta O(log n + CARGA) en
+    # lugar de los O(n) de bisect.insort sobre una única lista. Recorrer desde un valor cuesta
+    # O(log n) para ubicarse más O(1) por elemento entregado.
+    CARGA = 1000
+
+    def __init__(self, valores=()):
+        self.tramos = []   # Listas ordenadas; todos los valores de un tramo son <= los del siguiente
+        self.maximos = []  # Último valor de cada tramo, para ubicar un valor con bisect
+        self.longitud = 0
+        self.reemplazar(sorted(valores))
+
+    def __len__(self) -> int:
+        return self.longitud
+
+    def __iter__(self):
+        for tramo in self.tramos:
+            yield from tramo
+
+    def __reversed__(self):
+        for tramo in reversed(self.tramos):
+            yield from reversed(tramo)
+
+    def reemplazar(self, ordenados: list):
+        # Reemplaza el contenido por una lista que ya viene ordenada, en O(n) y sin volver a ordenar
+        carga = self.CARGA
+        self.tramos = [ordenados[i:i + carga] for i in range(0, len(ordenados), carga)]
+        self.maximos = [tramo[-1] for tramo in self.tramos]
+        self.longitud = len(ordenados)
+
+    def limpiar(self):
+        self.reemplazar([])
+
+    def agregar(self, valor):
+        # Inserta un valor en su posición
+        if not self.tramos:
+            self.tramos.append([valor])
+            self.maximos.append(valor)
+            self.longitud = 1
+            return
+        i = bisect.bisect_left(self.maximos, valor)
+        if i == len(self.tramos):
+            # Mayor que todos: va al final del último tramo
+            i -= 1
+            self.tramos[i].append(valor)
+            self.maximos[i] = valor
+        else:
+            bisect.insort(self.tramos[i], valor)
+        self.longitud += 1
+        tramo = self.tramos[i]
+        if len(tramo) > 2 * self.CARGA:
+            # El tramo creció demasiado: se parte en dos mitades
+            mitad = len(tramo) // 2
+            self.tramos[i:i + 1] = [tramo[:mitad], tramo[mitad:]]
+            self.maximos[i:i + 1] = [tramo[mitad - 1], tramo[-1]]
+
+    def agregar_varios(self, valores):
+        # Inserta muchos valores. Si son pocos frente al tamaño de la lista se insertan de a uno;
+        # si no, se mezclan con el contenido actual (sort reconoce las dos secuencias ordenadas
+        # y las mezcla en tiempo lineal) y se vuelven a repartir los tramos
+        valores = sorted(valores)
+        if len(valores) * 8 < self.longitud:
+            for valor in valores:
+                self.agregar(valor)
+            return
+        todos = list(self)
+        todos.extend(valores)
+        todos.sort()
+        self.reemplazar(todos)
+
+    def quitar(self, valor) -> bool:
+        # Quita una aparición del valor; devuelve False si no estaba
+        i = bisect.bisect_left(self.maximos, valor)
+        if i == len(self.tramos):
+            return False
+        tramo = self.tramos[i]
+        j = bisect.bisect_left(tramo, valor)
+        if j == len(tramo) or tramo[j] != valor:
+            return False
+        del tramo[j]
+        self.longitud -= 1
+        if not tramo:
+            del self.tramos[i]
+            del self.maximos[i]
+        else:
+            self.maximos[i] = tramo[-1]
+            if len(tramo) < self.CARGA // 2 and i + 1 < len(self.tramos):
+                # El tramo quedó chico: se une con el siguiente (y se vuelve a partir si hace falta)
+                siguiente = self.tramos[i + 1]
+                tramo.extend(siguiente)
+                del self.tramos[i + 1]
+                del self.maximos[i + 1]
+                self.maximos[i] = tramo[-1]
+                if len(tramo) > 2 * self.CARGA:
+                    mitad = len(tramo) // 2
+                    self.tramos[i:i + 1] = [tramo[:mitad], tramo[mitad:]]
+                    self.maximos[i:i + 1] = [tramo[mitad - 1], tramo[-1]]
+        return True
+
+    def desde(self, valor=None, incluido: bool = True):
+        # Recorre en orden los valores >= valor (o > valor si incluido es False); sin valor, todos
+        if valor is None:
+            yield from self
+            return
+        buscar = bisect.bisect_left if incluido else bisect.bisect_right
+        i = buscar(self.maximos, valor)
+        if i == len(self.tramos):
+            return
+        tramo = self.tramos[i]
+        yield from islice(tramo, buscar(tramo, valor), None)
+        for tramo in islice(self.tramos, i + 1, None):
+            yield from tramo
@@ -1,3 +1,11 @@
+import math
+import operator
+from array import array
+from itertools import compress, repeat
+
+from indice_trigramas import IndiceTrigramas
+
+
 class Producto:
     # Clase que representa un producto en el inventario
     def __init__(self, id_producto: int, nombre: str, cantidad: int, precio: float):
@@ -11,8 +19,10 @@ class Producto:
 
 class Inventario:
     # Clase que gestiona el inventario de productos
-    def __init__(self):
+    def __init__(self, usar_indice: bool = False):
         self.productos = {}  # Diccionario para almacenar los productos con ID como clave
+        # Índice opcional de trigramas para acelerar la búsqueda por nombre en catálogos grandes
+        self.indice = IndiceTrigramas() if usar_indice else None
     
     def agregar_producto(self, producto: Producto):
         # Agrega un nuevo producto al inventario si el ID no está en uso
@@ -20,12 +30,16 @@ class Inventario:
             print("Error: ID ya existe en el inventario.")
         else:
             self.productos[producto.id_producto] = producto
+            if self.indice is not None:
+                self.indice.agregar(producto.id_producto, producto.nombre)
             print("Producto agregado correctamente.")
     
     def eliminar_producto(self, id_producto: int):
         # Elimina un producto del inventario si existe
         if id_producto in self.productos:
             del self.productos[id_producto]
+            if self.indice is not None:
+                self.indice.eliminar(id_producto)
             print("Producto eliminado correctamente.")
         else:
             print("Error: Producto no encontrado.")
@@ -41,9 +55,25 @@ class Inventario:
         else:
             print("Error: Producto no encontrado.")
     
+    def renombrar_producto(self, id_producto: int, nuevo_nombre: str):
+        # Cambia el nombre de un producto si existe, manteniendo el índice al día
+        if id_producto in self.productos:
+            self.productos[id_producto].nombre = nuevo_nombre
+            if self.indice is not None:
+                self.indice.renombrar(id_producto, nuevo_nombre)
+            print("Producto renombrado correctamente.")
+        else:
+            print("Error: Producto no encontrado.")
+
+    def encontrar_productos(self, nombre: str) -> list:
+        # Devuelve los productos cuyo nombre contiene el texto (puede haber coincidencias parciales)
+        if self.indice is not None:
+            return [self.productos[id_producto] for id_producto in self.indice.buscar(nombre)]
+        return [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
+
     def buscar_producto(self, nombre: str):
         # Busca productos por nombre (puede haber coincidencias parciales)
-        encontrados = [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
+        encontrados = self.encontrar_productos(nombre)
         if encontrados:
             for p in encontrados:
                 print(p)
@@ -58,9 +88,144 @@ class Inventario:
         else:
             print("El inventario está vacío.")
 
-def menu():
-    # Función que maneja el menú interactivo en la consola
-    inventario = Inventario()
+class InventarioColumnar:
+    # Alternativa a Inventario para catálogos muy grandes: en lugar de un objeto Producto por artículo,
+    # guarda IDs, cantidades y precios en arreglos tipados contiguos (una columna por campo) y los nombres
+    # en una tabla sin repetidos. Ofrece la misma interfaz que Inventario, así que menu() funciona igual,
+    # y además consultas que recorren las columnas completas sin un ciclo de Python por producto.
+    def __init__(self, usar_indice: bool = False):
+        self.ids = array("q")              # ID de cada fila
+        self.cantidades = array("q")       # Cantidad de cada fila
+        self.precios = array("d")          # Precio de cada fila
+        self.codigos_nombre = array("q")   # Posición del nombre de cada fila en la tabla de nombres
+        self.tabla_nombres = []            # Nombres distintos; cada uno se guarda una sola vez
+        self.codigo_de_nombre = {}         # Nombre -> posición en la tabla de nombres
+        self.posiciones = {}               # ID -> fila en las columnas
+        self.indice = IndiceTrigramas() if usar_indice else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def codificar_nombre(self, nombre: str) -> int:
+        # Devuelve el código del nombre, agregándolo a la tabla si es nuevo
+        codigo = self.codigo_de_nombre.get(nombre)
+        if codigo is None:
+            codigo = len(self.tabla_nombres)
+            self.tabla_nombres.append(nombre)
+            self.codigo_de_nombre[nombre] = codigo
+        return codigo
+
+    def producto_en(self, fila: int) -> Producto:
+        # Arma un Producto con los datos de una fila (solo cuando hay que mostrarlo o devolverlo)
+        return Producto(self.ids[fila], self.tabla_nombres[self.codigos_nombre[fila]],
+                        self.cantidades[fila], self.precios[fila])
+
+    def agregar_producto(self, producto: Producto):
+        # Agrega un nuevo producto al inventario si el ID no está en uso
+        if producto.id_producto in self.posiciones:
+            print("Error: ID ya existe en el inventario.")
+        else:
+            self.posiciones[producto.id_producto] = len(self.ids)
+            self.ids.append(producto.id_producto)
+            self.cantidades.append(producto.cantidad)
+            self.precios.append(producto.precio)
+            self.codigos_nombre.append(self.codificar_nombre(producto.nombre))
+            if self.indice is not None:
+                self.indice.agregar(producto.id_producto, producto.nombre)
+            print("Producto agregado correctamente.")
+
+    def eliminar_producto(self, id_producto: int):
+        # Elimina un producto moviendo la última fila a su lugar, así no hay que desplazar las columnas
+        if id_producto in self.posiciones:
+            fila = self.posiciones.pop(id_producto)
+            ultima = len(self.ids) - 1
+            if fila != ultima:
+                for columna in (self.ids, self.cantidades, self.precios, self.codigos_nombre):
+                    columna[fila] = columna[ultima]
+                self.posiciones[self.ids[fila]] = fila
+            for columna in (self.ids, self.cantidades, self.precios, self.codigos_nombre):
+                columna.pop()
+            if self.indice is not None:
+                self.indice.eliminar(id_producto)
+            print("Producto eliminado correctamente.")
+        else:
+            print("Error: Producto no encontrado.")
+
+    def actualizar_producto(self, id_producto: int, cantidad: int = None, precio: float = None):
+        # Actualiza la cantidad o el precio de un producto si existe
+        if id_producto in self.posiciones:
+            fila = self.posiciones[id_producto]
+            if cantidad is not None:
+                self.cantidades[fila] = cantidad
+            if precio is not None:
+                self.precios[fila] = precio
+            print("Producto actualizado correctamente.")
+        else:
+            print("Error: Producto no encontrado.")
+
+    def renombrar_producto(self, id_producto: int, nuevo_nombre: str):
+        # Cambia el nombre de un producto si existe, manteniendo el índice al día
+        if id_producto in self.posiciones:
+            self.codigos_nombre[self.posiciones[id_producto]] = self.codificar_nombre(nuevo_nombre)
+            if self.indice is not None:
+                self.indice.renombrar(id_producto, nuevo_nombre)
+            print("Producto renombrado correctamente.")
+        else:
+            print("Error: Producto no encontrado.")
+
+    def encontrar_productos(self, nombre: str) -> list:
+        # Devuelve los productos cuyo nombre contiene el texto (puede haber coincidencias parciales)
+        if self.indice is not None:
+            return [self.producto_en(self.posiciones[id_producto]) for id_producto in self.indice.buscar(nombre)]
+        texto = nombre.lower()
+        # Se compara cada nombre distinto una sola vez y luego se filtran las filas por su código
+        codigos = {codigo for codigo, n in enumerate(self.tabla_nombres) if texto in n.lower()}
+        return [self.producto_en(fila) for fila, codigo in enumerate(self.codigos_nombre) if codigo in codigos]
+
+    def buscar_producto(self, nombre: str):
+        # Busca productos por nombre (puede haber coincidencias parciales)
+        encontrados = self.encontrar_productos(nombre)
+        if encontrados:
+            for p in encontrados:
+                print(p)
+        else:
+            print("No se encontraron productos con ese nombre.")
+
+    def mostrar_productos(self):
+        # Muestra todos los productos en el inventario
+        if self.ids:
+            for fila in range(len(self.ids)):
+                print(self.producto_en(fila))
+        else:
+            print("El inventario está vacío.")
+
+    def valor_total(self) -> float:
+        # Suma cantidad * precio de todas las filas; map y fsum recorren las columnas en C
+        return math.fsum(map(operator.mul, self.cantidades, self.precios))
+
+    def productos_bajo_stock(self, nivel_minimo: int) -> list:
+        # Productos cuya cantidad es menor que el nivel de reposición
+        filas = compress(range(len(self.ids)), map(operator.gt, repeat(nivel_minimo), self.cantidades))
+        return [self.producto_en(fila) for fila in filas]
+
+    def productos_en_rango_precio(self, minimo: float, maximo: float) -> list:
+        # Productos con precio entre minimo y maximo (ambos incluidos)
+        en_rango = map(operator.and_,
+                       map(operator.le, repeat(minimo), self.precios),
+                       map(operator.ge, repeat(maximo), self.precios))
+        return [self.producto_en(fila) for fila in compress(range(len(self.ids)), en_rango)]
+
+    def ajustar_precios(self, porcentaje: float):
+        # Sube (o baja, con un porcentaje negativo) todos los precios en un solo paso sobre la columna
+        factor = 1 + porcentaje / 100
+        self.precios = array("d", map(factor.__mul__, self.precios))
+
+
+def menu(inventario=None):
+    # Función que maneja el menú interactivo en la consola.
+    # Recibe cualquier inventario con la interfaz de Inventario (por ejemplo un InventarioColumnar).
+    if inventario is None:
+        inventario = Inventario()
     while True:
         print("\n#### Inicio ####")
         print("1. Agregar producto")
@@ -1,3 +1,26 @@
+import atexit
+import heapq
+import locale
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+
+from indice_trigramas import IndiceTrigramas
+
+try:
+    import fcntl  # Bloqueo de archivos en Linux y macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Bloqueo de archivos en Windows
+
+# Tamaño en bytes a partir del cual el archivo de inventario se carga en paralelo
+UMBRAL_CARGA_PARALELA = 8 * 1024 * 1024
+
+
 class Producto:
     # Clase que representa un producto en el inventario
     def __init__(self, id_producto: int, nombre: str, cantidad: int, precio: float):
@@ -10,49 +33,507 @@ class Producto:
         return f"ID: {self.id_producto}, Nombre: {self.nombre}, Cantidad: {self.cantidad}, Precio: ${self.precio:.2f}"
 
 
+def parsear_lineas(lineas) -> tuple:
+    # Convierte líneas con formato id;nombre;cantidad;precio en tuplas (id, nombre, cantidad, precio).
+    # Devuelve la lista de filas y la lista de líneas que no se pudieron convertir.
+    filas = []
+    errores = []
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea:
+            continue  # Salta líneas vacías
+        if linea.startswith("#"):
+            continue  # Las líneas de cabecera guardan metadatos, no productos
+        partes = linea.split(";")
+        if len(partes) == 4:
+            try:
+                id_producto = int(partes[0])
+                nombre = partes[1]
+                cantidad = int(partes[2])
+                precio = float(partes[3])
+                filas.append((id_producto, nombre, cantidad, precio))
+            except ValueError:
+                errores.append(linea)
+    return filas, errores
+
+
+def dividir_en_bloques(archivo: str, num_bloques: int) -> list:
+    # Divide el archivo en rangos (inicio, fin) de tamaño parecido que siempre terminan en un salto de línea
+    with open(archivo, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        tamano = len(mm)
+        paso = max(tamano // num_bloques, 1)
+        bloques = []
+        inicio = 0
+        while inicio < tamano:
+            fin = mm.find(b"\n", min(inicio + paso, tamano) - 1)
+            fin = tamano if fin == -1 else fin + 1
+            bloques.append((inicio, fin))
+            inicio = fin
+    return bloques
+
+
+def parsear_bloque(archivo: str, inicio: int, fin: int, codificacion: str) -> tuple:
+    # Se ejecuta en un proceso del grupo: mapea el archivo en memoria y parsea solo su bloque.
+    # Devuelve tuplas en lugar de objetos Producto porque son mucho más baratas de enviar entre procesos.
+    with open(archivo, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        texto = mm[inicio:fin].decode(codificacion)
+    return parsear_lineas(texto.split("\n"))
+
+
+@contextmanager
+def cerrojo_de_archivo(ruta: str):
+    # Bloqueo exclusivo entre procesos sobre un archivo auxiliar; espera si otro proceso lo tiene
+    with open(ruta, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def leer_cabecera(archivo: str) -> dict:
+    # Lee los metadatos de la primera línea del archivo (formato: #clave=valor;clave=valor)
+    with open(archivo, "r") as f:
+        primera = f.readline().strip()
+    if not primera.startswith("#"):
+        return {}
+    cabecera = {}
+    for par in primera[1:].split(";"):
+        clave, _, valor = par.partition("=")
+        cabecera[clave] = valor
+    return cabecera
+
+
+def entero_de_cabecera(cabecera: dict, clave: str, defecto: int) -> int:
+    # Valor entero de la cabecera; si falta o está dañado se usa el valor por defecto
+    try:
+        return int(cabecera.get(clave, defecto))
+    except ValueError:
+        print(f"Aviso: el valor de '{clave}' en la cabecera del inventario no es válido; se usará {defecto}.")
+        return defecto
+
+
+class AsignadorIds:
+    # Asigna IDs en O(1) a partir de una marca de agua alta (el siguiente ID nunca entregado).
+    # Opcionalmente reutiliza los IDs liberados, empezando siempre por el menor.
+    def __init__(self, siguiente: int = 1, reutilizar: bool = False):
+        self.siguiente = siguiente
+        self.reutilizar = reutilizar
+        self.libres = []          # Montículo con los IDs liberados
+        self.en_libres = set()    # IDs que siguen libres (los del montículo que ya no estén aquí se ignoran)
+
+    def asignar(self) -> int:
+        # Entrega un ID libre si se reutilizan IDs; si no, el siguiente de la marca de agua
+        if self.reutilizar:
+            while self.libres:
+                id_libre = heapq.heappop(self.libres)
+                if id_libre in self.en_libres:
+                    self.en_libres.remove(id_libre)
+                    return id_libre
+        nuevo_id = self.siguiente
+        self.siguiente += 1
+        return nuevo_id
+
+    def reservar(self, cantidad: int) -> range:
+        # Reserva un bloque contiguo de IDs con una sola operación, útil para importaciones masivas
+        bloque = range(self.siguiente, self.siguiente + cantidad)
+        self.siguiente += cantidad
+        return bloque
+
+    def registrar(self, id_producto: int):
+        # Marca como usado un ID que llegó de fuera del asignador (archivo, diario o ingreso manual)
+        if id_producto >= self.siguiente:
+            self.siguiente = id_producto + 1
+        self.en_libres.discard(id_producto)
+
+    def liberar(self, id_producto: int):
+        # Devuelve un ID a la lista de libres si está activada la reutilización
+        if self.reutilizar and id_producto < self.siguiente and id_producto not in self.en_libres:
+            self.en_libres.add(id_producto)
+            heapq.heappush(self.libres, id_producto)
+
+    def recalcular_libres(self, usados):
+        # Reconstruye la lista de libres con los huecos entre 1 y la marca de agua (solo al cargar)
+        if self.reutilizar:
+            self.libres = [i for i in range(1, self.siguiente) if i not in usados]
+            self.en_libres = set(self.libres)  # La lista ya está ordenada, así que es un montículo válido
+
+
+class ArchivoBinario:
+    # Archivo de inventario binario con registros de tamaño fijo.
+    # Como cada registro ocupa siempre los mismos bytes, cambiar la cantidad o el precio de un producto
+    # consiste en saltar a su posición y sobrescribir solo ese campo, sin reescribir el archivo.
+    # Los productos eliminados quedan marcados como lápidas hasta la siguiente compactación.
+    CABECERA = struct.Struct("<4sHHq")  # Firma, versión, bytes reservados para el nombre, siguiente ID
+    FIRMA = b"INVB"
+    VERSION = 1
+    ACTIVO = 1
+    LAPIDA = 0
+
+    def __init__(self, ruta: str, longitud_nombre: int = 64):
+        self.ruta = ruta
+        self.definir_registro(longitud_nombre)
+        self.posiciones = {}  # ID -> posición en bytes del registro dentro del archivo
+        self.lapidas = 0      # Registros eliminados que todavía ocupan espacio
+
+    def definir_registro(self, longitud_nombre: int):
+        # Registro: estado, id, nombre (bytes UTF-8 rellenos con ceros), cantidad, precio
+        self.longitud_nombre = longitud_nombre
+        self.registro = struct.Struct(f"<Bq{longitud_nombre}sqd")
+        self.desplazamiento_nombre = 1 + 8
+        self.desplazamiento_cantidad = self.desplazamiento_nombre + longitud_nombre
+        self.desplazamiento_precio = self.desplazamiento_cantidad + 8
+
+    def nombre_valido(self, nombre: str) -> bool:
+        # El nombre tiene que caber en el espacio fijo reservado en cada registro
+        return len(nombre.encode("utf-8")) <= self.longitud_nombre
+
+    def codificar_nombre(self, nombre: str) -> bytes:
+        if not self.nombre_valido(nombre):
+            raise ValueError(f"El nombre '{nombre}' supera los {self.longitud_nombre} bytes del formato binario.")
+        return nombre.encode("utf-8")
+
+    def leer(self) -> tuple:
+        # Lee el archivo completo. Devuelve la lista de productos activos y el siguiente ID guardado.
+        with open(self.ruta, "rb") as f:
+            datos = f.read()
+        firma, version, longitud_nombre, siguiente_id = self.CABECERA.unpack_from(datos, 0)
+        if firma != self.FIRMA or version != self.VERSION:
+            raise ValueError(f"{self.ruta} no es un archivo de inventario binario válido.")
+        self.definir_registro(longitud_nombre)
+        inicio = self.CABECERA.size
+        sobrante = (len(datos) - inicio) % self.registro.size
+        if sobrante:
+            # Un registro incompleto al final (por ejemplo, una escritura interrumpida) se descarta
+            print(f"Se ignoraron {sobrante} bytes incompletos al final de {self.ruta}.")
+        productos = []
+        self.posiciones = {}
+        self.lapidas = 0
+        posicion = inicio
+        for estado, id_producto, nombre, cantidad, precio in self.registro.iter_unpack(
+                memoryview(datos)[inicio:len(datos) - sobrante]):
+            if estado == self.ACTIVO:
+                productos.append(Producto(id_producto, nombre.rstrip(b"\0").decode("utf-8"), cantidad, precio))
+                self.posiciones[id_producto] = posicion
+            else:
+                self.lapidas += 1
+            posicion += self.registro.size
+        return productos, siguiente_id
+
+    def escribir_todo(self, productos, siguiente_id: int):
+        # Reescribe el archivo completo sin lápidas (se usa al crear, convertir y compactar)
+        bloques = [self.CABECERA.pack(self.FIRMA, self.VERSION, self.longitud_nombre, siguiente_id)]
+        posiciones = {}
+        posicion = self.CABECERA.size
+        for producto in productos:
+            bloques.append(self.registro.pack(self.ACTIVO, producto.id_producto,
+                                              self.codificar_nombre(producto.nombre),
+                                              producto.cantidad, producto.precio))
+            posiciones[producto.id_producto] = posicion
+            posicion += self.registro.size
+        with open(self.ruta, "wb") as f:
+            f.write(b"".join(bloques))
+        self.posiciones = posiciones
+        self.lapidas = 0
+
+    def aplicar(self, registros: list, siguiente_id: int):
+        # Aplica cambios en el lugar: altas al final, bajas como lápidas y modificaciones campo a campo
+        with open(self.ruta, "r+b") as f:
+            for registro in registros:
+                tipo, id_producto = registro[0], registro[1]
+                if tipo == "A":
+                    _, _, nombre, cantidad, precio = registro
+                    posicion = f.seek(0, os.SEEK_END)
+                    f.write(self.registro.pack(self.ACTIVO, id_producto, self.codificar_nombre(nombre),
+                                               cantidad, precio))
+                    self.posiciones[id_producto] = posicion
+                elif tipo == "E":
+                    f.seek(self.posiciones.pop(id_producto))
+                    f.write(bytes([self.LAPIDA]))
+                    self.lapidas += 1
+                elif tipo == "M":
+                    _, _, cantidad, precio = registro
+                    if cantidad is not None:
+                        f.seek(self.posiciones[id_producto] + self.desplazamiento_cantidad)
+                        f.write(struct.pack("<q", cantidad))
+                    if precio is not None:
+                        f.seek(self.posiciones[id_producto] + self.desplazamiento_precio)
+                        f.write(struct.pack("<d", precio))
+                elif tipo == "N":
+                    f.seek(self.posiciones[id_producto] + self.desplazamiento_nombre)
+                    f.write(struct.pack(f"{self.longitud_nombre}s", self.codificar_nombre(registro[2])))
+            # El siguiente ID vive en la cabecera, justo después de la firma, la versión y la longitud
+            f.seek(4 + 2 + 2)
+            f.write(struct.pack("<q", siguiente_id))
+
+
+def convertir_texto_a_binario(ruta_texto: str, ruta_binaria: str, longitud_nombre: int = 64):
+    # Convierte un inventario de texto (incluido su diario, si tiene) al formato binario
+    if not os.path.exists(ruta_texto):
+        raise FileNotFoundError(ruta_texto)
+    inventario = Inventario(ruta_texto)
+    ArchivoBinario(ruta_binaria, longitud_nombre).escribir_todo(inventario.productos.values(),
+                                                                inventario.asignador.siguiente)
+
+
+def convertir_binario_a_texto(ruta_binaria: str, ruta_texto: str):
+    # Convierte un inventario binario al formato de texto id;nombre;cantidad;precio
+    productos, siguiente_id = ArchivoBinario(ruta_binaria).leer()
+    with open(ruta_texto, "w") as f:
+        f.write(f"#siguiente_id={siguiente_id}\n")
+        for producto in productos:
+            f.write(f"{producto.id_producto};{producto.nombre};{producto.cantidad};{producto.precio}\n")
+    # Un diario que quedara de una versión anterior del archivo de texto ya no corresponde
+    if os.path.exists(ruta_texto + ".log"):
+        os.remove(ruta_texto + ".log")
+
+
+class EscritorDiferido(threading.Thread):
+    # Hilo que guarda el inventario en segundo plano. Las operaciones solo marcan que hay cambios y
+    # regresan de inmediato; el hilo espera el intervalo configurado para juntar las ráfagas de cambios
+    # y las guarda todas con una sola escritura atómica (archivo temporal + renombrar).
+    def __init__(self, inventario, intervalo: float = 1.0, fsync: str = "siempre"):
+        super().__init__(name="EscritorDiferido", daemon=True)
+        if fsync not in ("siempre", "nunca"):
+            raise ValueError("La política de fsync debe ser 'siempre' o 'nunca'.")
+        self.inventario = inventario
+        self.intervalo = intervalo  # Segundos que se esperan para agrupar cambios antes de escribir
+        self.fsync = fsync          # "siempre": forzar la escritura al disco en cada guardado
+        self.condicion = threading.Condition()
+        self.cambios = 0            # Cambios marcados desde que se creó el escritor
+        self.guardados = 0          # Valor de "cambios" que ya quedó escrito en el archivo
+        self.fallos = 0             # Escrituras fallidas, para que flush() no espere indefinidamente
+        self.urgente = False        # Se pidió escribir sin esperar el intervalo (flush o cierre)
+        self.detenido = False
+
+    def marcar_cambio(self):
+        # Registra que hay cambios pendientes; no escribe nada en el hilo que llama
+        with self.condicion:
+            self.cambios += 1
+            self.condicion.notify_all()
+
+    def run(self):
+        try:
+            while True:
+                with self.condicion:
+                    self.condicion.wait_for(lambda: self.cambios != self.guardados or self.detenido)
+                    if self.cambios == self.guardados:
+                        return  # Se pidió detener el hilo y no queda nada por escribir
+                    # Se espera el intervalo para que los cambios que lleguen mientras tanto
+                    # se guarden en la misma escritura
+                    self.condicion.wait_for(lambda: self.urgente or self.detenido, timeout=self.intervalo)
+                    objetivo = self.cambios
+                    self.urgente = False
+                exito = self.inventario.guardar_inventario(sincronizar=self.fsync == "siempre")
+                with self.condicion:
+                    if exito:
+                        self.guardados = max(self.guardados, objetivo)
+                    else:
+                        self.fallos += 1
+                    self.condicion.notify_all()
+                    if not exito:
+                        if self.detenido:
+                            return
+                        # Se reintenta después de un intervalo en lugar de insistir sin pausa
+                        self.condicion.wait_for(lambda: self.detenido, timeout=self.intervalo)
+        finally:
+            with self.condicion:
+                self.detenido = True
+                self.condicion.notify_all()
+
+    def flush(self) -> bool:
+        # Escribe de inmediato los cambios pendientes y espera a que queden guardados
+        with self.condicion:
+            objetivo = self.cambios
+            fallos = self.fallos
+            self.urgente = True
+            self.condicion.notify_all()
+            # El hilo avisa al terminar cuando todavía está vivo, así que se vuelve a comprobar cada
+            # poco: si terminó sin guardar (por ejemplo, por una excepción) no se espera para siempre
+            while not self.condicion.wait_for(lambda: self.guardados >= objetivo or self.fallos > fallos
+                                              or not self.is_alive(), timeout=0.05):
+                pass
+            return self.guardados >= objetivo
+
+    def cerrar(self) -> bool:
+        # Guarda lo pendiente y detiene el hilo; se puede llamar más de una vez
+        if not self.is_alive():
+            return self.guardados >= self.cambios
+        exito = self.flush()
+        with self.condicion:
+            self.detenido = True
+            self.condicion.notify_all()
+        self.join()
+        return exito
+
+
 class Inventario:
     # Clase que gestiona el inventario de productos y su persistencia en archivo
-    def __init__(self):
+    def __init__(self, archivo: str = None, modo_diario: bool = False, limite_diario: int = 1000,
+                 umbral_carga_paralela: int = UMBRAL_CARGA_PARALELA, usar_indice: bool = False,
+                 reutilizar_ids: bool = False, formato: str = "texto", escritura_diferida: bool = False,
+                 intervalo_escritura: float = 1.0, fsync: str = "siempre", compartido: bool = False):
         self.productos = {}  # Diccionario para almacenar los productos con ID como clave
-        self.archivo = "inventario.txt"
-        self.cargar_inventario()  # Carga los productos existentes al iniciar
+        if archivo is None:
+            archivo = "inventario.bin" if formato == "binario" else "inventario.txt"
+        self.archivo = archivo
+        # En formato binario los cambios se escriben en el lugar sobre registros de tamaño fijo
+        self.archivo_binario = ArchivoBinario(archivo) if formato == "binario" else None
+        # En modo diario cada cambio se añade como una línea al final de un archivo de diario
+        # en lugar de reescribir todo el inventario en cada operación
+        self.modo_diario = modo_diario
+        self.archivo_diario = archivo + ".log"
+        self.limite_diario = limite_diario  # Cantidad de registros a partir de la cual se compacta el diario
+        self.registros_diario = 0           # Registros acumulados en el diario desde la última compactación
+        self.umbral_carga_paralela = umbral_carga_paralela  # Bytes a partir de los cuales se carga en paralelo
+        self.cambios_lote = None   # Registros pendientes del lote en curso (None si no hay lote)
+        self.deshacer_lote = None  # Funciones para revertir cada cambio del lote en curso
+        # Índice opcional de trigramas para acelerar la búsqueda por nombre en catálogos grandes
+        self.indice = IndiceTrigramas() if usar_indice else None
+        self.reutilizar_ids = reutilizar_ids
+        self.asignador = AsignadorIds(reutilizar=reutilizar_ids)  # Se siembra al cargar el inventario
+        # Protege los productos cuando el escritor en segundo plano los copia para guardarlos
+        self.cerrojo = threading.RLock()
+        self.escritor = None
+        # En modo compartido varios procesos usan el mismo archivo: cada operación toma un bloqueo de
+        # archivo y antes de actuar incorpora los cambios que hayan guardado los demás procesos
+        self.compartido = compartido
+        if compartido and escritura_diferida:
+            raise ValueError("El modo compartido necesita guardar cada cambio de inmediato; "
+                             "no se puede combinar con la escritura diferida.")
+        self.archivo_cerrojo = archivo + ".lock"
+        self.nivel_seccion = 0          # Secciones críticas anidadas que tiene abiertas este proceso
+        self.generacion = 0             # Contador de guardados completos, escrito en la cabecera
+        self.firma_archivo = None       # (fecha de modificación, tamaño) del archivo en la última lectura
+        self.posicion_diario = 0        # Bytes del diario ya aplicados
+        with cerrojo_de_archivo(self.archivo_cerrojo) if compartido else nullcontext():
+            self.cargar_inventario()  # Carga los productos existentes al iniciar
+        # Con escritura diferida las operaciones no esperan al disco: un hilo guarda los cambios agrupados
+        if escritura_diferida:
+            if self.archivo_binario is not None:
+                raise ValueError("La escritura diferida solo está disponible para el formato de texto.")
+            self.escritor = EscritorDiferido(self, intervalo_escritura, fsync)
+            self.escritor.start()
+            atexit.register(self.cerrar)  # Último recurso si el programa termina sin llamar a cerrar()
 
     def cargar_inventario(self):
         # Carga el inventario desde el archivo. Si el archivo no existe, se crea uno nuevo.
         try:
-            with open(self.archivo, "r") as f:
-                for linea in f:
-                    linea = linea.strip()
-                    if not linea:
-                        continue  # Salta líneas vacías
-                    partes = linea.split(";")
-                    if len(partes) == 4:
-                        try:
-                            id_producto = int(partes[0])
-                            nombre = partes[1]
-                            cantidad = int(partes[2])
-                            precio = float(partes[3])
-                            producto = Producto(id_producto, nombre, cantidad, precio)
-                            self.productos[id_producto] = producto
-                        except ValueError:
-                            print(f"Error al convertir datos de la línea: {linea}")
+            if self.archivo_binario is not None:
+                self.firma_archivo = self.leer_firma()[0]
+                productos, siguiente_id = self.archivo_binario.leer()
+                self.asignador = AsignadorIds(siguiente_id, self.reutilizar_ids)
+                for producto in productos:
+                    self.productos[producto.id_producto] = producto
+            else:
+                # La marca de agua guardada en la cabecera evita reutilizar IDs de productos ya eliminados
+                self.firma_archivo = self.leer_firma()[0]
+                cabecera = leer_cabecera(self.archivo)
+                # Si la cabecera está dañada, el máximo ID cargado fija la marca de agua más abajo
+                self.asignador = AsignadorIds(entero_de_cabecera(cabecera, "siguiente_id", 1), self.reutilizar_ids)
+                self.generacion = entero_de_cabecera(cabecera, "generacion", 0)
+                # Los archivos pequeños se leen en un solo proceso; los grandes se reparten entre varios núcleos
+                if os.path.getsize(self.archivo) >= self.umbral_carga_paralela:
+                    self.cargar_inventario_paralelo()
+                else:
+                    self.cargar_inventario_secuencial()
+                self.reproducir_diario()  # Aplica los cambios registrados después de la última instantánea
+            # Se recorre la lista de IDs una sola vez al cargar, no en cada alta
+            self.asignador.registrar(max(self.productos.keys(), default=0))
+            self.asignador.recalcular_libres(self.productos)
+            if self.indice is not None:
+                # El índice se construye una sola vez con el estado final, no en cada línea leída
+                self.indice.reconstruir((p.id_producto, p.nombre) for p in self.productos.values())
         except FileNotFoundError:
             # Si el archivo no existe, se crea uno vacío
-            with open(self.archivo, "w") as f:
-                pass
+            if self.archivo_binario is not None:
+                self.archivo_binario.escribir_todo([], self.asignador.siguiente)
+            else:
+                with open(self.archivo, "w") as f:
+                    pass
             print("Archivo de inventario no encontrado. Se ha creado uno nuevo.")
         except PermissionError:
             print("Error: Permiso denegado para leer el archivo de inventario.")
         except Exception as e:
             print("Error inesperado al cargar el inventario:", e)
 
-    def guardar_inventario(self) -> bool:
-        # Guarda el inventario actual en el archivo
+    def cargar_inventario_secuencial(self):
+        # Lee el archivo línea por línea en el proceso actual
+        with open(self.archivo, "r") as f:
+            filas, errores = parsear_lineas(f)
+        self.agregar_filas(filas, errores)
+
+    def agregar_filas(self, filas: list, errores: list):
+        # Crea los productos a partir de filas ya parseadas e informa las líneas con errores
+        for id_producto, nombre, cantidad, precio in filas:
+            self.productos[id_producto] = Producto(id_producto, nombre, cantidad, precio)
+        for linea in errores:
+            print(f"Error al convertir datos de la línea: {linea}")
+
+    def cargar_inventario_paralelo(self):
+        # Divide el archivo en bloques alineados a fin de línea y los procesa en un grupo de procesos.
+        # Los resultados parciales se combinan en el orden del archivo, igual que en la lectura secuencial.
+        num_procesos = os.cpu_count() or 1
+        if num_procesos < 2:
+            # Con un solo núcleo repartir el trabajo solo añade el costo de comunicar procesos
+            self.cargar_inventario_secuencial()
+            return
+        bloques = dividir_en_bloques(self.archivo, num_procesos * 4)
+        codificacion = locale.getpreferredencoding(False)
         try:
-            with open(self.archivo, "w") as f:
-                for producto in self.productos.values():
+            with ProcessPoolExecutor(max_workers=num_procesos) as grupo:
+                resultados = list(grupo.map(parsear_bloque,
+                                            [self.archivo] * len(bloques),
+                                            [inicio for inicio, _ in bloques],
+                                            [fin for _, fin in bloques],
+                                            [codificacion] * len(bloques)))
+        except (OSError, BrokenProcessPool) as e:
+            # Si no se pueden crear procesos se vuelve a la lectura en un solo proceso
+            print("No se pudo usar la carga en paralelo, se leerá de forma secuencial:", e)
+            self.cargar_inventario_secuencial()
+            return
+        for filas, errores in resultados:
+            self.agregar_filas(filas, errores)
+
+    def guardar_inventario(self, sincronizar: bool = False) -> bool:
+        # Guarda el inventario actual en el archivo. Si sincronizar es True se fuerza la escritura al disco.
+        try:
+            if self.archivo_binario is not None:
+                with self.seccion_critica():
+                    self.archivo_binario.escribir_todo(self.productos.values(), self.asignador.siguiente)
+                return True
+            # En modo compartido todo el guardado ocurre con el bloqueo de archivo tomado
+            with self.seccion_critica() if self.compartido else nullcontext():
+                # Se copian los datos bajo el cerrojo y se escriben fuera de él, para no bloquear las operaciones
+                with self.seccion_critica():
+                    siguiente_id = self.asignador.siguiente
+                    self.generacion += 1
+                    generacion = self.generacion
+                    filas = [(p.id_producto, p.nombre, p.cantidad, p.precio) for p in self.productos.values()]
+                # Se escribe en un archivo temporal y luego se renombra: quien lea el inventario
+                # siempre encuentra la versión anterior completa o la nueva completa
+                temporal = self.archivo + ".tmp"
+                with open(temporal, "w") as f:
+                    f.write(f"#siguiente_id={siguiente_id};generacion={generacion}\n")
                     # Se escribe cada producto en una línea con formato: id;nombre;cantidad;precio
-                    f.write(f"{producto.id_producto};{producto.nombre};{producto.cantidad};{producto.precio}\n")
+                    f.writelines(f"{id_producto};{nombre};{cantidad};{precio}\n"
+                                 for id_producto, nombre, cantidad, precio in filas)
+                    if sincronizar:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(temporal, self.archivo)
+                # La instantánea ya contiene todos los cambios, así que el diario deja de ser necesario
+                if os.path.exists(self.archivo_diario):
+                    os.remove(self.archivo_diario)
+                self.registros_diario = 0
             return True
         except FileNotFoundError:
             print("Error: Archivo de inventario no encontrado.")
@@ -64,52 +545,349 @@ class Inventario:
             print("Error inesperado al guardar el inventario:", e)
             return False
 
+    def reproducir_diario(self, desde: int = 0):
+        # Aplica sobre los productos cargados los registros del diario, en el orden en que se escribieron.
+        # Con "desde" se aplican solo los registros a partir de esa posición (los que agregó otro proceso).
+        # Formato de cada línea: A;id;nombre;cantidad;precio | E;id | M;id;cantidad;precio (vacío = sin cambio)
+        # | N;id;nombre (cambio de nombre)
+        if desde == 0:
+            self.registros_diario = 0
+        self.posicion_diario = 0
+        if not os.path.exists(self.archivo_diario):
+            return
+        with open(self.archivo_diario, "r") as f:
+            f.seek(desde)
+            while True:
+                linea = f.readline()
+                if not linea:
+                    break
+                linea = linea.strip()
+                if not linea:
+                    continue
+                partes = linea.split(";")
+                try:
+                    if partes[0] == "A" and len(partes) == 5:
+                        id_producto = int(partes[1])
+                        self.productos[id_producto] = Producto(id_producto, partes[2], int(partes[3]), float(partes[4]))
+                        self.asignador.registrar(id_producto)
+                        if self.indice is not None:
+                            self.indice.renombrar(id_producto, partes[2])
+                    elif partes[0] == "E" and len(partes) == 2:
+                        id_producto = int(partes[1])
+                        if self.productos.pop(id_producto, None) is not None:
+                            self.asignador.liberar(id_producto)
+                            if self.indice is not None:
+                                self.indice.eliminar(id_producto)
+                    elif partes[0] == "M" and len(partes) == 4:
+                        producto = self.productos.get(int(partes[1]))
+                        if producto is not None:
+                            if partes[2]:
+                                producto.cantidad = int(partes[2])
+                            if partes[3]:
+                                producto.precio = float(partes[3])
+                    elif partes[0] == "N" and len(partes) == 3:
+                        producto = self.productos.get(int(partes[1]))
+                        if producto is not None:
+                            producto.nombre = partes[2]
+                            if self.indice is not None:
+                                self.indice.renombrar(producto.id_producto, partes[2])
+                    else:
+                        print(f"Registro de diario no reconocido: {linea}")
+                        continue
+                    self.registros_diario += 1
+                except ValueError:
+                    print(f"Error al convertir datos del registro de diario: {linea}")
+            self.posicion_diario = f.tell()
+
+    def leer_firma(self) -> tuple:
+        # Estado en disco del archivo principal (fecha de modificación y tamaño) y tamaño del diario
+        estado = os.stat(self.archivo)
+        tamano_diario = os.path.getsize(self.archivo_diario) if os.path.exists(self.archivo_diario) else 0
+        return (estado.st_mtime_ns, estado.st_size), tamano_diario
+
+    def recargar_inventario(self):
+        # Descarta los productos en memoria y vuelve a leer el archivo completo
+        self.productos.clear()
+        self.cargar_inventario()
+        print("Se detectaron cambios de otro proceso: inventario recargado.")
+
+    def sincronizar(self):
+        # Incorpora los cambios guardados por otros procesos desde la última lectura o escritura propia.
+        # Si solo creció el diario se aplican los registros nuevos; si cambió la instantánea se recarga todo.
+        try:
+            firma_archivo, tamano_diario = self.leer_firma()
+        except FileNotFoundError:
+            return
+        if firma_archivo != self.firma_archivo:
+            # La fecha o el tamaño cambiaron; el contador de generación confirma si hubo un guardado nuevo
+            if self.archivo_binario is not None or \
+                    entero_de_cabecera(leer_cabecera(self.archivo), "generacion", 0) != self.generacion:
+                self.recargar_inventario()
+                return
+            self.firma_archivo = firma_archivo
+        if tamano_diario > self.posicion_diario:
+            self.reproducir_diario(desde=self.posicion_diario)
+        elif tamano_diario < self.posicion_diario:
+            self.recargar_inventario()
+
+    def actualizar_firma(self):
+        # Toma como conocida la versión en disco que acaba de escribir este mismo proceso
+        try:
+            self.firma_archivo, self.posicion_diario = self.leer_firma()
+        except FileNotFoundError:
+            pass
+
+    def registrar_en_diario(self, registros: list) -> bool:
+        # Añade los registros al final del diario con una sola escritura y compacta si se supera el límite
+        try:
+            with open(self.archivo_diario, "a") as f:
+                f.write("".join(";".join("" if valor is None else str(valor) for valor in registro) + "\n"
+                                for registro in registros))
+        except PermissionError:
+            print("Error: Permiso denegado para escribir en el diario del inventario.")
+            return False
+        except Exception as e:
+            print("Error inesperado al escribir en el diario del inventario:", e)
+            return False
+        self.registros_diario += len(registros)
+        # Con los registros ya en el diario los cambios están guardados: si la compactación falla
+        # no se informa un error (un lote se desharía en memoria pero seguiría en el diario)
+        # y se vuelve a intentar con el próximo cambio
+        if self.registros_diario >= self.limite_diario and not self.compactar_inventario():
+            print("Aviso: no se pudo compactar el diario del inventario; se reintentará más adelante.")
+        return True
+
+    def compactar_inventario(self) -> bool:
+        # Vuelca el estado actual en una instantánea nueva; guardar_inventario descarta el diario
+        # (o, en formato binario, reescribe el archivo sin lápidas)
+        return self.guardar_inventario()
+
+    def aplicar_en_binario(self, registros: list) -> bool:
+        # Escribe los cambios en el lugar dentro del archivo binario y compacta cuando
+        # las lápidas ya ocupan más espacio que los productos activos
+        try:
+            self.archivo_binario.aplicar(registros, self.asignador.siguiente)
+        except PermissionError:
+            print("Error: Permiso denegado para escribir en el archivo de inventario.")
+            return False
+        except Exception as e:
+            print("Error inesperado al escribir en el archivo binario:", e)
+            return False
+        if self.archivo_binario.lapidas > len(self.productos):
+            return self.compactar_inventario()
+        return True
+
+    def persistir_cambios(self, registros: list) -> bool:
+        # Persiste cambios como tuplas (tipo, id, ...): con escritura diferida solo se avisa al escritor,
+        # en formato binario se escriben en el lugar, en modo diario solo se añaden líneas
+        # y si no se reescribe el archivo completo
+        if self.escritor is not None:
+            self.escritor.marcar_cambio()
+            return True
+        if self.archivo_binario is not None:
+            return self.aplicar_en_binario(registros)
+        if self.modo_diario:
+            return self.registrar_en_diario(registros)
+        return self.guardar_inventario()
+
+    @contextmanager
+    def lote(self):
+        # Transacción para cambios masivos: dentro del bloque "with" los cambios se aplican solo en memoria,
+        # sin mensajes por operación. Al salir se persisten con una única escritura; si algo falla,
+        # se revierten todos los cambios del lote y se propaga la excepción.
+        if self.cambios_lote is not None:
+            raise RuntimeError("Ya hay un lote en curso.")
+        # El lote completo es una sola sección crítica: en modo compartido otro proceso no puede
+        # guardar a mitad del lote, así que no hay recargas que pisen los cambios pendientes
+        with self.seccion_critica():
+            self.cambios_lote = []
+            self.deshacer_lote = []
+            try:
+                yield self
+                if self.cambios_lote and not self.persistir_cambios(self.cambios_lote):
+                    raise OSError("No se pudo guardar el lote de cambios.")
+            except BaseException:
+                # Se deshacen los cambios en orden inverso para volver al estado previo al lote
+                for deshacer in reversed(self.deshacer_lote):
+                    deshacer()
+                print(f"Lote cancelado: se revirtieron {len(self.deshacer_lote)} cambios.")
+                raise
+            finally:
+                self.cambios_lote = None
+                self.deshacer_lote = None
+
+    @contextmanager
+    def seccion_critica(self):
+        # Bloque en el que se modifican los productos o se copian para guardarlos.
+        # En modo compartido la sección más externa también toma el bloqueo de archivo y sincroniza.
+        with self.cerrojo:
+            if not self.compartido or self.nivel_seccion > 0:
+                self.nivel_seccion += 1
+                try:
+                    yield
+                finally:
+                    self.nivel_seccion -= 1
+                return
+            with cerrojo_de_archivo(self.archivo_cerrojo):
+                self.nivel_seccion += 1
+                try:
+                    self.sincronizar()
+                    yield
+                finally:
+                    self.nivel_seccion -= 1
+                    self.actualizar_firma()
+
+    def flush(self) -> bool:
+        # Espera a que los cambios pendientes del escritor diferido queden guardados
+        if self.escritor is not None:
+            return self.escritor.flush()
+        return True
+
+    def cerrar(self) -> bool:
+        # Guarda lo pendiente y detiene el escritor diferido; se llama al salir del programa
+        if self.escritor is not None:
+            return self.escritor.cerrar()
+        return True
+
+    def informar_error(self, mensaje: str):
+        # Dentro de un lote los errores cancelan la transacción; fuera de él solo se muestran
+        if self.cambios_lote is not None:
+            raise ValueError(mensaje)
+        print(mensaje)
+
     def obtener_siguiente_id(self) -> int:
-        # Calcula el siguiente ID disponible basado en los productos existentes
-        return max(self.productos.keys(), default=0) + 1
+        # Entrega el siguiente ID disponible sin recorrer los productos existentes
+        with self.seccion_critica():
+            return self.asignador.asignar()
+
+    def reservar_ids(self, cantidad: int) -> range:
+        # Reserva un bloque de IDs consecutivos para importaciones masivas
+        with self.seccion_critica():
+            return self.asignador.reservar(cantidad)
 
     def agregar_producto(self, producto: Producto):
         # Agrega un nuevo producto al inventario si el ID no está en uso
-        if producto.id_producto in self.productos:
-            print("Error: ID ya existe en el inventario.")
-        else:
+        with self.seccion_critica():
+            if producto.id_producto in self.productos:
+                self.informar_error("Error: ID ya existe en el inventario.")
+                return
+            if self.archivo_binario is not None and not self.archivo_binario.nombre_valido(producto.nombre):
+                self.informar_error(f"Error: El nombre no puede superar {self.archivo_binario.longitud_nombre} bytes.")
+                return
             self.productos[producto.id_producto] = producto
+            self.asignador.registrar(producto.id_producto)
+            if self.indice is not None:
+                self.indice.agregar(producto.id_producto, producto.nombre)
+            registro = ("A", producto.id_producto, producto.nombre, producto.cantidad, producto.precio)
+            if self.cambios_lote is not None:
+                self.cambios_lote.append(registro)
+
+                def deshacer():
+                    del self.productos[producto.id_producto]
+                    self.asignador.liberar(producto.id_producto)
+                    if self.indice is not None:
+                        self.indice.eliminar(producto.id_producto)
+                self.deshacer_lote.append(deshacer)
+                return
             print("Producto agregado correctamente en memoria.")
-            if self.guardar_inventario():
+            if self.persistir_cambios([registro]):
                 print("El inventario se ha guardado exitosamente en el archivo.")
             else:
                 print("Error al guardar el inventario en el archivo.")
 
     def eliminar_producto(self, id_producto: int):
         # Elimina un producto del inventario si existe
-        if id_producto in self.productos:
-            del self.productos[id_producto]
+        with self.seccion_critica():
+            if id_producto not in self.productos:
+                self.informar_error("Error: Producto no encontrado.")
+                return
+            producto = self.productos.pop(id_producto)
+            self.asignador.liberar(id_producto)
+            if self.indice is not None:
+                self.indice.eliminar(id_producto)
+            registro = ("E", id_producto)
+            if self.cambios_lote is not None:
+                self.cambios_lote.append(registro)
+
+                def deshacer():
+                    self.productos[id_producto] = producto
+                    self.asignador.registrar(id_producto)
+                    if self.indice is not None:
+                        self.indice.agregar(id_producto, producto.nombre)
+                self.deshacer_lote.append(deshacer)
+                return
             print("Producto eliminado correctamente de memoria.")
-            if self.guardar_inventario():
+            if self.persistir_cambios([registro]):
                 print("El inventario se ha actualizado exitosamente en el archivo.")
             else:
                 print("Error al actualizar el inventario en el archivo.")
-        else:
-            print("Error: Producto no encontrado.")
 
     def actualizar_producto(self, id_producto: int, cantidad: int = None, precio: float = None):
         # Actualiza la cantidad o el precio de un producto si existe
-        if id_producto in self.productos:
+        with self.seccion_critica():
+            if id_producto not in self.productos:
+                self.informar_error("Error: Producto no encontrado.")
+                return
+            producto = self.productos[id_producto]
+            cantidad_anterior, precio_anterior = producto.cantidad, producto.precio
             if cantidad is not None:
-                self.productos[id_producto].cantidad = cantidad
+                producto.cantidad = cantidad
             if precio is not None:
-                self.productos[id_producto].precio = precio
+                producto.precio = precio
+            registro = ("M", id_producto, cantidad, precio)
+            if self.cambios_lote is not None:
+                self.cambios_lote.append(registro)
+
+                def deshacer():
+                    producto.cantidad, producto.precio = cantidad_anterior, precio_anterior
+                self.deshacer_lote.append(deshacer)
+                return
             print("Producto actualizado correctamente en memoria.")
-            if self.guardar_inventario():
+            if self.persistir_cambios([registro]):
+                print("El inventario se ha guardado exitosamente en el archivo.")
+            else:
+                print("Error al guardar el inventario en el archivo.")
+
+    def renombrar_producto(self, id_producto: int, nuevo_nombre: str):
+        # Cambia el nombre de un producto si existe, manteniendo el índice al día
+        with self.seccion_critica():
+            if id_producto not in self.productos:
+                self.informar_error("Error: Producto no encontrado.")
+                return
+            if self.archivo_binario is not None and not self.archivo_binario.nombre_valido(nuevo_nombre):
+                self.informar_error(f"Error: El nombre no puede superar {self.archivo_binario.longitud_nombre} bytes.")
+                return
+            producto = self.productos[id_producto]
+            nombre_anterior = producto.nombre
+            producto.nombre = nuevo_nombre
+            if self.indice is not None:
+                self.indice.renombrar(id_producto, nuevo_nombre)
+            registro = ("N", id_producto, nuevo_nombre)
+            if self.cambios_lote is not None:
+                self.cambios_lote.append(registro)
+
+                def deshacer():
+                    producto.nombre = nombre_anterior
+                    if self.indice is not None:
+                        self.indice.renombrar(id_producto, nombre_anterior)
+                self.deshacer_lote.append(deshacer)
+                return
+            print("Producto renombrado correctamente en memoria.")
+            if self.persistir_cambios([registro]):
                 print("El inventario se ha guardado exitosamente en el archivo.")
             else:
                 print("Error al guardar el inventario en el archivo.")
-        else:
-            print("Error: Producto no encontrado.")
+
+    def encontrar_productos(self, nombre: str) -> list:
+        # Devuelve los productos cuyo nombre contiene el texto (puede haber coincidencias parciales)
+        with self.seccion_critica():
+            if self.indice is not None:
+                return [self.productos[id_producto] for id_producto in self.indice.buscar(nombre)]
+            return [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
 
     def buscar_producto(self, nombre: str):
         # Busca productos por nombre (puede haber coincidencias parciales)
-        encontrados = [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
+        encontrados = self.encontrar_productos(nombre)
         if encontrados:
             for p in encontrados:
                 print(p)
@@ -118,16 +896,18 @@ class Inventario:
 
     def mostrar_productos(self):
         # Muestra todos los productos en el inventario
-        if self.productos:
-            for producto in self.productos.values():
-                print(producto)
-        else:
-            print("El inventario está vacío.")
+        with self.seccion_critica():
+            if self.productos:
+                for producto in self.productos.values():
+                    print(producto)
+            else:
+                print("El inventario está vacío.")
 
 
 def menu():
-    # Función que maneja el menú interactivo en la consola
-    inventario = Inventario()
+    # Función que maneja el menú interactivo en la consola.
+    # Se abre en modo compartido para que varias terminales puedan trabajar con el mismo archivo.
+    inventario = Inventario(compartido=True)
     while True:
         print("\n--- Menú de Gestión de Inventarios ---")
         print("1. Agregar producto")
@@ -140,11 +920,12 @@ def menu():
 
         if opcion == "1":
             try:
-                # Se asigna el ID automáticamente sin solicitarlo al usuario
-                nuevo_id = inventario.obtener_siguiente_id()
                 nombre = input("Nombre del producto: ")
                 cantidad = int(input("Cantidad: "))
                 precio = float(input("Precio: "))
+                # Se asigna el ID automáticamente sin solicitarlo al usuario, justo antes de agregar
+                # el producto para que otra terminal no tome el mismo ID mientras se escriben los datos
+                nuevo_id = inventario.obtener_siguiente_id()
                 producto = Producto(nuevo_id, nombre, cantidad, precio)
                 inventario.agregar_producto(producto)
             except ValueError:
@@ -173,6 +954,8 @@ def menu():
         elif opcion == "5":
             inventario.mostrar_productos()
         elif opcion == "6":
+            if not inventario.cerrar():
+                print("Error: No se pudieron guardar los últimos cambios del inventario.")
             print("Saliendo del programa...")
             break
         else:
@@ -1,10 +1,60 @@
+import argparse
+import bisect
+import contextlib
+import gc
+import heapq
 import json
+import marshal
+import math
 import os
-from datetime import datetime
+import shlex
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from itertools import islice, takewhile
+
+from indice_trigramas import IndiceTrigramas
+from lista_ordenada import ListaOrdenada
+
+try:
+    import fcntl  # Bloqueo de archivos en Linux y macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Bloqueo de archivos en Windows
+
+# Cantidad máxima de resultados que muestra la búsqueda interactiva
+LIMITE_BUSQUEDA = 50
+# Productos por página al mostrar el inventario en el menú
+TAMANO_PAGINA = 20
+# Productos que se agregan juntos al cargar un archivo
+TAMANO_LOTE_CARGA = 10_000
+# Cabecera de la instantánea binaria: marca, versión, CRC32 y longitud de los datos, y tamaño y
+# fecha de modificación del archivo base y de su archivo de diferencias cuando se guardó
+CABECERA_SNAPSHOT = struct.Struct("<4sHIQqqqq")
+MARCA_SNAPSHOT = b"INVS"
+VERSION_SNAPSHOT = 4
+# Extensiones de archivo con las que SistemaInventario usa la base de datos SQLite
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")
+# Carpeta donde los procesos de la máquina reclaman su número de nodo para generar IDs
+DIRECTORIO_NODOS = os.path.join(tempfile.gettempdir(), "semana11_nodos")
+# Cantidad por debajo de la cual un producto se considera con stock bajo
+NIVEL_REPOSICION = 10
+# Límites de las bandas de precio del histograma: la banda i va de LIMITES[i-1] (incluido) a LIMITES[i]
+LIMITES_BANDAS_PRECIO = (1, 5, 10, 20, 50, 100, 500)
+# Cuándo se sincroniza con el disco el registro de escritura anticipada (ver Inventario.activar_wal)
+POLITICAS_FSYNC_WAL = ("siempre", "lote", "nunca")
 
 class Producto:
     """Clase para representar un producto en el inventario"""
     
+    # Sin __dict__ por instancia: con millones de productos es la mayor parte de la memoria
+    __slots__ = ('_id', '_nombre', '_cantidad', '_precio', '_observador')
+    
     def __init__(self, id, nombre, cantidad, precio):
         """Constructor de la clase Producto
         
@@ -15,9 +65,22 @@ class Producto:
             precio (float): Precio unitario del producto
         """
         self._id = id
-        self._nombre = nombre
+        # Los nombres repetidos comparten un único objeto str
+        self._nombre = sys.intern(nombre) if type(nombre) is str else nombre
         self._cantidad = cantidad
         self._precio = precio
+        # Función a la que se avisa cada cambio (la registra el Inventario que contiene al producto)
+        self._observador = None
+    
+    def notificar_cambio(self, campo, valor_anterior):
+        """Avisa al observador registrado que cambió un atributo
+        
+        Args:
+            campo (str): Nombre del atributo que cambió
+            valor_anterior: Valor que tenía antes del cambio
+        """
+        if self._observador is not None:
+            self._observador(self, campo, valor_anterior)
     
     @property
     def id(self):
@@ -29,7 +92,9 @@ class Producto:
     
     @nombre.setter
     def nombre(self, nuevo_nombre):
-        self._nombre = nuevo_nombre
+        anterior = self._nombre
+        self._nombre = sys.intern(nuevo_nombre) if type(nuevo_nombre) is str else nuevo_nombre
+        self.notificar_cambio('nombre', anterior)
     
     @property
     def cantidad(self):
@@ -38,7 +103,9 @@ class Producto:
     @cantidad.setter
     def cantidad(self, nueva_cantidad):
         if nueva_cantidad >= 0:
+            anterior = self._cantidad
             self._cantidad = nueva_cantidad
+            self.notificar_cambio('cantidad', anterior)
         else:
             raise ValueError("La cantidad no puede ser negativa")
     
@@ -49,7 +116,9 @@ class Producto:
     @precio.setter
     def precio(self, nuevo_precio):
         if nuevo_precio > 0:
+            anterior = self._precio
             self._precio = nuevo_precio
+            self.notificar_cambio('precio', anterior)
         else:
             raise ValueError("El precio debe ser mayor que cero")
     
@@ -66,6 +135,9 @@ class Producto:
     def from_dict(cls, dict_data):
         """Crea un objeto Producto a partir de un diccionario
         
+        El ID se convierte a str: un archivo puede traer IDs numéricos junto a IDs de texto,
+        y los índices ordenados del inventario necesitan poder compararlos entre sí.
+        
         Args:
             dict_data (dict): Diccionario con los datos del producto
             
@@ -73,7 +145,7 @@ class Producto:
             Producto: Nueva instancia de Producto
         """
         return cls(
-            dict_data['id'],
+            str(dict_data['id']),
             dict_data['nombre'],
             dict_data['cantidad'],
             dict_data['precio']
@@ -83,17 +155,213 @@ class Producto:
         return f"ID: {self._id} | Nombre: {self._nombre} | Cantidad: {self._cantidad} | Precio: ${self._precio:.2f}"
 
 
+class GeneradorIds:
+    """Clase para generar IDs de producto únicos y crecientes
+    
+    Cada ID tiene la forma P<AAAAMMDDhhmmss><nodo:4><secuencia:6>: el segundo actual en UTC,
+    un número de nodo que distingue a los procesos que generan IDs a la vez y un contador que
+    se reinicia cada segundo. Generar un ID cuesta O(1) y no depende de los IDs ya usados.
+    Si en un segundo se agota la secuencia, o si el reloj retrocede, se sigue con el segundo
+    siguiente al último usado, de modo que los IDs nunca se repiten ni decrecen.
+    
+    Si no se indica el nodo, el generador reclama uno libre en el registro de nodos de la
+    máquina (ver _reclamar_nodo) al generar el primer ID. El registro solo distingue procesos
+    de una misma máquina: los que escriben desde máquinas distintas deben recibir nodos
+    explícitos y distintos.
+    """
+    
+    MAX_SECUENCIA = 1_000_000
+    MAX_NODO = 10_000
+    # Último segundo usado por el nodo, guardado al principio de su archivo de registro
+    FORMATO_REGISTRO = struct.Struct("<Q")
+    
+    def __init__(self, nodo=None, prefijo="P", directorio_nodos=DIRECTORIO_NODOS):
+        """Constructor de la clase GeneradorIds
+        
+        Args:
+            nodo (int): Número de nodo entre 0 y 9999, distinto para cada proceso que genere IDs
+                para el mismo inventario. Si no se indica se reclama uno en directorio_nodos
+            prefijo (str): Prefijo de los IDs generados
+            directorio_nodos (str): Carpeta del registro de nodos de la máquina
+        """
+        if nodo is not None and not 0 <= nodo < self.MAX_NODO:
+            raise ValueError(f"El nodo debe estar entre 0 y {self.MAX_NODO - 1}")
+        self._prefijo = prefijo
+        self._nodo = nodo
+        self._directorio_nodos = directorio_nodos
+        self._registro_nodo = None  # Descriptor del archivo de registro del nodo reclamado
+        self._segundo = 0
+        self._secuencia = 0
+        self._base = None  # Prefijo + segundo + nodo ya formateados para el segundo actual
+        self._cerrojo = threading.Lock()
+    
+    def __del__(self):
+        if getattr(self, '_registro_nodo', None) is not None:
+            os.close(self._registro_nodo)  # Libera el nodo para otros procesos
+    
+    @staticmethod
+    def _bloquear_sin_esperar(descriptor):
+        """Toma un bloqueo exclusivo sobre un archivo abierto; False si ya lo tiene otro"""
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                # Se bloquea un byte después del registro, para poder seguir escribiéndolo
+                os.lseek(descriptor, GeneradorIds.FORMATO_REGISTRO.size, os.SEEK_SET)
+                msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    
+    def _reclamar_nodo(self):
+        """Elige un nodo que no use ningún otro proceso de la máquina
+        
+        Cada nodo tiene un archivo en directorio_nodos que su dueño mantiene bloqueado mientras
+        vive. El archivo guarda el último segundo en que el nodo generó IDs, así que quien
+        reclama el nodo de un proceso ya terminado sigue desde el segundo posterior y no repite
+        sus IDs. Si no se puede usar el registro, el nodo se elige al azar y la unicidad pasa a
+        ser solo probable.
+        """
+        try:
+            os.makedirs(self._directorio_nodos, exist_ok=True)
+            inicio = os.getpid() % self.MAX_NODO
+            for desplazamiento in range(self.MAX_NODO):
+                nodo = (inicio + desplazamiento) % self.MAX_NODO
+                descriptor = os.open(os.path.join(self._directorio_nodos, f"nodo_{nodo:04d}"),
+                                     os.O_RDWR | os.O_CREAT, 0o666)
+                if not self._bloquear_sin_esperar(descriptor):
+                    os.close(descriptor)
+                    continue
+                os.lseek(descriptor, 0, os.SEEK_SET)
+                datos = os.read(descriptor, self.FORMATO_REGISTRO.size)
+                if len(datos) == self.FORMATO_REGISTRO.size:
+                    # Secuencia agotada en el último segundo del dueño anterior: se sigue después
+                    self._segundo = self.FORMATO_REGISTRO.unpack(datos)[0]
+                    self._secuencia = self.MAX_SECUENCIA
+                self._nodo = nodo
+                self._registro_nodo = descriptor
+                return
+        except OSError:
+            pass
+        self._nodo = int.from_bytes(os.urandom(4), "little") % self.MAX_NODO
+    
+    def _tomar(self, cantidad):
+        """Reserva un tramo de la secuencia y devuelve la base formateada y el primer número"""
+        with self._cerrojo:
+            if self._nodo is None:
+                self._reclamar_nodo()
+            ahora = int(time.time())
+            if ahora > self._segundo:
+                self._segundo = ahora
+                self._secuencia = 0
+                self._base = None
+            if self._secuencia + cantidad > self.MAX_SECUENCIA:
+                # Secuencia agotada en este segundo: se usa el siguiente, aunque todavía no haya llegado
+                self._segundo += 1
+                self._secuencia = 0
+                self._base = None
+            if self._base is None:
+                marca = time.strftime("%Y%m%d%H%M%S", time.gmtime(self._segundo))
+                self._base = f"{self._prefijo}{marca}{self._nodo:04d}"
+                if self._registro_nodo is not None:
+                    os.lseek(self._registro_nodo, 0, os.SEEK_SET)
+                    os.write(self._registro_nodo, self.FORMATO_REGISTRO.pack(self._segundo))
+            inicio = self._secuencia
+            self._secuencia += cantidad
+            return self._base, inicio
+    
+    def siguiente(self):
+        """Genera un nuevo ID
+        
+        Returns:
+            str: ID generado
+        """
+        base, numero = self._tomar(1)
+        return f"{base}{numero:06d}"
+    
+    def reservar(self, cantidad):
+        """Genera varios IDs de una vez, útil para importaciones masivas
+        
+        Args:
+            cantidad (int): Número de IDs a reservar
+            
+        Returns:
+            list: IDs reservados, en orden creciente
+        """
+        ids = []
+        while cantidad > 0:
+            tramo = min(cantidad, self.MAX_SECUENCIA)
+            base, inicio = self._tomar(tramo)
+            ids.extend(f"{base}{numero:06d}" for numero in range(inicio, inicio + tramo))
+            cantidad -= tramo
+        return ids
+
+
 class Inventario:
     """Clase para gestionar la colección de productos"""
     
-    def __init__(self):
-        """Constructor de la clase Inventario"""
+    # Claves de orden para paginar; el ID desempata, así cada producto tiene una posición única
+    CLAVES_ORDEN = {
+        'id': lambda producto: (producto._id,),
+        'nombre': lambda producto: (producto._nombre.lower(), producto._id),
+        'precio': lambda producto: (producto._precio, producto._id),
+        'cantidad': lambda producto: (producto._cantidad, producto._id),
+    }
+    
+    # Atributos con índice ordenado para consultas por rango
+    CAMPOS_ORDENADOS = ('cantidad', 'precio')
+    
+    def __init__(self, nodo_id=None, depurar_agregados=False):
+        """Constructor de la clase Inventario
+        
+        Args:
+            nodo_id (int): Número de nodo para el generador de IDs (ver GeneradorIds)
+            depurar_agregados (bool): Si es True, después de cada cambio se recalculan los
+                totales desde cero y se comprueba que coincidan con los mantenidos (lento)
+        """
         # Diccionario para almacenar productos, usando ID como clave para búsqueda rápida
+        # (también garantiza la unicidad de los IDs)
         self._productos = {}
-        # Conjunto para mantener IDs usados y garantizar unicidad
-        self._ids_usados = set()
         # Diccionario para indexar productos por nombre para búsquedas eficientes
+        # (nombre en minúsculas -> conjunto de IDs, para quitar un ID en O(1))
         self._indice_nombre = {}
+        # Índice de trigramas sobre los nombres distintos, para búsquedas parciales sin recorrer todos
+        self._indice_subcadenas = IndiceTrigramas()
+        # Pares (valor, id) ordenados por cantidad y por precio, para consultas por rango en
+        # O(log n + k). Son ListaOrdenada y no listas simples: insertar y quitar un par cuesta
+        # O(log n) más un tramo acotado, en lugar de desplazar toda la lista como bisect.insort
+        self._indices_ordenados = {campo: ListaOrdenada() for campo in self.CAMPOS_ORDENADOS}
+        # IDs y pares (nombre en minúsculas, id) ordenados, para paginar por ID y por nombre
+        # sin recorrer el inventario completo en cada página
+        self._ids_ordenados = ListaOrdenada()
+        self._nombres_ordenados = ListaOrdenada()
+        # Totales que se actualizan en O(1) con cada cambio, para no recorrer el inventario al informarlos
+        self._total_unidades = 0
+        self._valor_total = 0.0
+        # Histograma por banda de precio: productos y unidades en cada banda
+        self._productos_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        self._unidades_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        self.depurar_agregados = depurar_agregados
+        # Formato del último archivo cargado ("json" o "ndjson"), para guardar en el mismo formato
+        self._formato_archivo = "json"
+        # Ruta absoluta del archivo base del inventario (el cargado, o el primero en que se guarda):
+        # los cambios pendientes y el archivo de diferencias se refieren a ese archivo
+        self._ruta_archivo = None
+        # IDs agregados, modificados y eliminados desde el último guardado, para guardar solo diferencias
+        self._agregados = set()
+        self._modificados = set()
+        self._eliminados = set()
+        # Registros acumulados en el archivo de diferencias desde la última reescritura completa
+        self._registros_delta = 0
+        # Generador de IDs nuevos
+        self._generador_ids = GeneradorIds(nodo_id)
+        # Un solo método enlazado compartido por todos los productos, en lugar de uno por producto
+        self._aviso_cambios = self.producto_modificado
+        # Registro de escritura anticipada (WAL): archivo donde se anota cada cambio antes de
+        # aplicarlo, su ruta y cuándo se sincroniza con el disco
+        self._wal = None
+        self._ruta_wal = None
+        self._fsync_wal = "siempre"
     
     def agregar_producto(self, producto):
         """Agrega un nuevo producto al inventario
@@ -104,21 +372,98 @@ class Inventario:
         Returns:
             bool: True si se agregó exitosamente, False si el ID ya existe
         """
-        if producto.id in self._ids_usados:
+        if producto.id in self._productos:
             return False
         
+        if self._wal is not None:
+            self.registrar_en_wal([{'op': 'put', 'producto': producto.to_dict()}])
+        
         # Agregar producto al diccionario principal
         self._productos[producto.id] = producto
-        self._ids_usados.add(producto.id)
         
-        # Actualizar índice por nombre
-        nombre_lower = producto.nombre.lower()
-        if nombre_lower not in self._indice_nombre:
-            self._indice_nombre[nombre_lower] = []
-        self._indice_nombre[nombre_lower].append(producto.id)
+        # Actualizar índice por nombre y los índices ordenados
+        self.indexar_nombre(producto.id, producto.nombre.lower())
+        self._ids_ordenados.agregar(producto.id)
+        self._indices_ordenados['cantidad'].agregar((producto.cantidad, producto.id))
+        self._indices_ordenados['precio'].agregar((producto.precio, producto.id))
+        self.sumar_a_agregados(producto.cantidad, producto.precio, 1)
+        
+        # Recibir avisos de los cambios que se hagan directamente sobre el producto
+        producto._observador = self._aviso_cambios
+        
+        # Registrar el cambio pendiente de guardar
+        if producto.id in self._eliminados:
+            # Se eliminó y se volvió a agregar: para el archivo es una modificación
+            self._eliminados.discard(producto.id)
+            self._modificados.add(producto.id)
+        else:
+            self._agregados.add(producto.id)
         
+        if self.depurar_agregados:
+            self.comprobar_agregados()
         return True
     
+    def agregar_en_bloque(self, productos):
+        """Agrega muchos productos de una vez, actualizando las estructuras por lote
+        
+        Evita el trabajo por producto de agregar_producto: el diccionario y el conjunto
+        de IDs se actualizan con una sola operación y el índice por nombre se agrupa
+        antes de actualizarse. Los productos deben venir ya validados.
+        
+        Args:
+            productos (list): Productos a agregar
+            
+        Returns:
+            list: Productos rechazados porque su ID ya existía (en el inventario o repetido en el lote)
+        """
+        nuevos = {}
+        rechazados = []
+        for producto in productos:
+            if producto.id in self._productos or producto.id in nuevos:
+                rechazados.append(producto)
+            else:
+                nuevos[producto.id] = producto
+        
+        if self._wal is not None and nuevos:
+            # Todos los registros del lote se escriben y sincronizan juntos
+            self.registrar_en_wal([{'op': 'put', 'producto': producto.to_dict()} for producto in nuevos.values()])
+        
+        self._productos.update(nuevos)
+        
+        # Agrupar por nombre para tocar cada entrada del índice una sola vez
+        por_nombre = {}
+        for id, producto in nuevos.items():
+            por_nombre.setdefault(sys.intern(producto._nombre.lower()), []).append(id)
+            producto._observador = self._aviso_cambios
+        for nombre_lower, ids in por_nombre.items():
+            existentes = self._indice_nombre.get(nombre_lower)
+            if existentes is None:
+                self._indice_nombre[nombre_lower] = set(ids)
+                self._indice_subcadenas.agregar(nombre_lower, nombre_lower)
+            else:
+                existentes.update(ids)
+        
+        # Los pares nuevos se insertan todos juntos (ver ListaOrdenada.agregar_varios)
+        self._ids_ordenados.agregar_varios(nuevos)
+        self._nombres_ordenados.agregar_varios((nombre_lower, id) for nombre_lower, ids in por_nombre.items()
+                                               for id in ids)
+        for campo, atributo in (('cantidad', '_cantidad'), ('precio', '_precio')):
+            self._indices_ordenados[campo].agregar_varios(
+                (getattr(producto, atributo), id) for id, producto in nuevos.items())
+        
+        # Registrar los cambios pendientes de guardar
+        reagregados = self._eliminados.intersection(nuevos)
+        if reagregados:
+            self._eliminados -= reagregados
+            self._modificados |= reagregados
+        self._agregados.update(id for id in nuevos if id not in reagregados)
+        
+        for producto in nuevos.values():
+            self.sumar_a_agregados(producto._cantidad, producto._precio, 1)
+        if self.depurar_agregados:
+            self.comprobar_agregados()
+        return rechazados
+    
     def eliminar_producto(self, id):
         """Elimina un producto del inventario
         
@@ -131,22 +476,326 @@ class Inventario:
         if id not in self._productos:
             return False
         
+        if self._wal is not None:
+            self.registrar_en_wal([{'op': 'del', 'id': id}])
+        
         # Eliminar de los índices
         producto = self._productos[id]
-        nombre_lower = producto.nombre.lower()
-        
-        if nombre_lower in self._indice_nombre:
-            if id in self._indice_nombre[nombre_lower]:
-                self._indice_nombre[nombre_lower].remove(id)
-                if not self._indice_nombre[nombre_lower]:
-                    del self._indice_nombre[nombre_lower]
+        self.desindexar_nombre(id, producto.nombre.lower())
+        self._ids_ordenados.quitar(id)
+        self.desindexar_valor('cantidad', id, producto.cantidad)
+        self.desindexar_valor('precio', id, producto.precio)
+        self.sumar_a_agregados(producto.cantidad, producto.precio, -1)
+        producto._observador = None
         
-        # Eliminar del diccionario principal y del conjunto de IDs
+        # Eliminar del diccionario principal
         del self._productos[id]
-        self._ids_usados.remove(id)
+        if self.depurar_agregados:
+            self.comprobar_agregados()
+        
+        # Registrar el cambio pendiente de guardar
+        if id in self._agregados:
+            # Nunca llegó a guardarse, así que no hace falta registrar nada
+            self._agregados.discard(id)
+        else:
+            self._modificados.discard(id)
+            self._eliminados.add(id)
         
         return True
     
+    def indexar_nombre(self, id, nombre_lower):
+        """Agrega un ID al índice por nombre (y el nombre al índice de subcadenas si es nuevo)
+        
+        También agrega el par (nombre, id) al orden por nombre.
+        
+        Args:
+            id (str): ID del producto
+            nombre_lower (str): Nombre del producto en minúsculas
+        """
+        # Internado, los productos con el mismo nombre comparten el texto en todos los índices
+        nombre_lower = sys.intern(nombre_lower)
+        self._nombres_ordenados.agregar((nombre_lower, id))
+        ids = self._indice_nombre.get(nombre_lower)
+        if ids is None:
+            self._indice_nombre[nombre_lower] = {id}
+            self._indice_subcadenas.agregar(nombre_lower, nombre_lower)
+        else:
+            ids.add(id)
+    
+    def desindexar_nombre(self, id, nombre_lower):
+        """Quita un ID del índice por nombre (y el nombre del índice de subcadenas si queda vacío)
+        
+        Args:
+            id (str): ID del producto
+            nombre_lower (str): Nombre del producto en minúsculas
+        """
+        self._nombres_ordenados.quitar((nombre_lower, id))
+        ids = self._indice_nombre.get(nombre_lower)
+        if ids is not None:
+            ids.discard(id)
+            if not ids:
+                del self._indice_nombre[nombre_lower]
+                self._indice_subcadenas.eliminar(nombre_lower)
+    
+    def desindexar_valor(self, campo, id, valor):
+        """Quita el par (valor, id) del índice ordenado de un campo
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            id (str): ID del producto
+            valor: Valor que tenía el producto en ese campo
+        """
+        self._indices_ordenados[campo].quitar((valor, id))
+    
+    def producto_modificado(self, producto, campo, valor_anterior):
+        """Recibe los avisos de cambio de los productos del inventario
+        
+        Mantiene los índices al día cuando cambia el nombre, la cantidad o el precio
+        de un producto y lo registra como modificado para el próximo guardado.
+        
+        Args:
+            producto (Producto): Producto que cambió
+            campo (str): Atributo que cambió
+            valor_anterior: Valor que tenía antes del cambio
+        """
+        if self._productos.get(producto.id) is not producto:
+            return  # El producto ya no pertenece a este inventario
+        if self._wal is not None:
+            try:
+                self.registrar_en_wal([{'op': 'put', 'producto': producto.to_dict()}])
+            except OSError:
+                # El cambio no quedó anotado: se deshace, para que el producto siga coincidiendo
+                # con los índices, los totales y el WAL, y el error llega a quien hizo el cambio
+                setattr(producto, '_' + campo, valor_anterior)
+                raise
+        if campo == 'nombre':
+            self.desindexar_nombre(producto.id, valor_anterior.lower())
+            self.indexar_nombre(producto.id, producto.nombre.lower())
+        elif campo in self._indices_ordenados:
+            self.desindexar_valor(campo, producto.id, valor_anterior)
+            self._indices_ordenados[campo].agregar((getattr(producto, campo), producto.id))
+            if campo == 'cantidad':
+                self.sumar_a_agregados(valor_anterior, producto.precio, -1)
+            else:
+                self.sumar_a_agregados(producto.cantidad, valor_anterior, -1)
+            self.sumar_a_agregados(producto.cantidad, producto.precio, 1)
+            if self.depurar_agregados:
+                self.comprobar_agregados()
+        self.marcar_modificado(producto.id)
+    
+    def verificar_indices(self, reparar=False):
+        """Comprueba que los índices coincidan con los productos
+        
+        Args:
+            reparar (bool): Si es True y hay diferencias, se reconstruyen los índices
+            
+        Returns:
+            list: Descripción de cada inconsistencia encontrada (vacía si todo está bien)
+        """
+        problemas = []
+        esperado = {}
+        for id, producto in self._productos.items():
+            esperado.setdefault(producto.nombre.lower(), set()).add(id)
+        
+        for nombre_lower in esperado.keys() | self._indice_nombre.keys():
+            ids_esperados = esperado.get(nombre_lower, set())
+            ids_indice = self._indice_nombre.get(nombre_lower, set())
+            if ids_esperados != ids_indice:
+                problemas.append(f"Índice por nombre de '{nombre_lower}': tiene {sorted(ids_indice)}, "
+                                 f"debería tener {sorted(ids_esperados)}")
+        
+        if self._indice_subcadenas.nombres.keys() != esperado.keys():
+            problemas.append("El índice de subcadenas no coincide con los nombres de los productos")
+        
+        for campo in self.CAMPOS_ORDENADOS:
+            if list(self._indices_ordenados[campo]) != self.pares_ordenados(campo):
+                problemas.append(f"El índice ordenado por {campo} no coincide con los productos")
+        if list(self._ids_ordenados) != sorted(self._productos):
+            problemas.append("El orden por ID no coincide con los productos")
+        if list(self._nombres_ordenados) != sorted(map(self.CLAVES_ORDEN['nombre'], self._productos.values())):
+            problemas.append("El orden por nombre no coincide con los productos")
+        
+        if problemas and reparar:
+            self.reconstruir_indices()
+        return problemas
+    
+    def reconstruir_indices(self):
+        """Vuelve a crear todos los índices a partir de los productos"""
+        self._indice_nombre.clear()
+        self._indice_subcadenas.reconstruir([])
+        self._nombres_ordenados.limpiar()
+        for id, producto in self._productos.items():
+            self.indexar_nombre(id, producto.nombre.lower())
+            producto._observador = self._aviso_cambios
+        self._ids_ordenados.reemplazar(sorted(self._productos))
+        for campo in self.CAMPOS_ORDENADOS:
+            self._indices_ordenados[campo].reemplazar(self.pares_ordenados(campo))
+        self.recalcular_agregados()
+    
+    def pares_ordenados(self, campo):
+        """Calcula desde los productos la lista ordenada de pares (valor, id) de un campo"""
+        atributo = '_' + campo
+        return sorted((getattr(producto, atributo), id) for id, producto in self._productos.items())
+    
+    def productos_en_rango(self, campo, minimo=None, maximo=None, limite=None):
+        """Obtiene los productos cuyo campo está entre minimo y maximo (ambos incluidos)
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            minimo: Valor mínimo (None para no poner límite inferior)
+            maximo: Valor máximo (None para no poner límite superior)
+            limite (int): Máximo de productos a devolver
+            
+        Returns:
+            list: Productos ordenados por el campo, de menor a mayor
+        """
+        if campo not in self._indices_ordenados:
+            raise ValueError(f"No hay índice ordenado para {campo}")
+        # (minimo,) es menor que todos los pares (minimo, id), así que el recorrido empieza en el primero
+        pares = self._indices_ordenados[campo].desde(None if minimo is None else (minimo,))
+        if maximo is not None:
+            pares = takewhile(lambda par: par[0] <= maximo, pares)
+        return [self._productos[id] for _, id in islice(pares, limite)]
+    
+    def mayores(self, campo, n):
+        """Obtiene los n productos con mayor valor en un campo
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            n (int): Número de productos
+            
+        Returns:
+            list: Productos de mayor a menor
+        """
+        return [self._productos[id] for _, id in islice(reversed(self._indices_ordenados[campo]), max(n, 0))]
+    
+    def menores(self, campo, n):
+        """Obtiene los n productos con menor valor en un campo
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            n (int): Número de productos
+            
+        Returns:
+            list: Productos de menor a mayor
+        """
+        return [self._productos[id] for _, id in islice(self._indices_ordenados[campo], max(n, 0))]
+    
+    def productos_bajo_stock(self, nivel_reposicion=NIVEL_REPOSICION):
+        """Obtiene los productos cuya cantidad está por debajo del nivel de reposición
+        
+        Args:
+            nivel_reposicion (int): Cantidad mínima deseada
+            
+        Returns:
+            list: Productos ordenados de menor a mayor cantidad
+        """
+        pares = takewhile(lambda par: par[0] < nivel_reposicion, self._indices_ordenados['cantidad'])
+        return [self._productos[id] for _, id in pares]
+    
+    @staticmethod
+    def banda_de_precio(precio):
+        """Obtiene el número de banda del histograma que corresponde a un precio"""
+        return bisect.bisect_right(LIMITES_BANDAS_PRECIO, precio)
+    
+    def sumar_a_agregados(self, cantidad, precio, signo):
+        """Suma (signo 1) o resta (signo -1) un producto de los totales y del histograma
+        
+        Args:
+            cantidad (int): Cantidad del producto
+            precio (float): Precio del producto
+            signo (int): 1 para sumar, -1 para restar
+        """
+        self._total_unidades += signo * cantidad
+        self._valor_total += signo * cantidad * precio
+        banda = bisect.bisect_right(LIMITES_BANDAS_PRECIO, precio)
+        self._productos_por_banda[banda] += signo
+        self._unidades_por_banda[banda] += signo * cantidad
+    
+    def recalcular_agregados(self):
+        """Vuelve a calcular desde cero los totales y el histograma a partir de los productos"""
+        self._total_unidades = 0
+        self._valor_total = 0.0
+        self._productos_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        self._unidades_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        for producto in self._productos.values():
+            self.sumar_a_agregados(producto._cantidad, producto._precio, 1)
+        # Al recalcular se usa una suma exacta para no arrastrar errores de redondeo
+        self._valor_total = math.fsum(producto._cantidad * producto._precio for producto in self._productos.values())
+    
+    def verificar_agregados(self):
+        """Comprueba que los totales mantenidos coincidan con los calculados desde cero
+        
+        Returns:
+            list: Descripción de cada diferencia encontrada (vacía si todo está bien)
+        """
+        problemas = []
+        unidades = sum(producto._cantidad for producto in self._productos.values())
+        valor = math.fsum(producto._cantidad * producto._precio for producto in self._productos.values())
+        productos_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        unidades_por_banda = [0] * (len(LIMITES_BANDAS_PRECIO) + 1)
+        for producto in self._productos.values():
+            banda = self.banda_de_precio(producto._precio)
+            productos_por_banda[banda] += 1
+            unidades_por_banda[banda] += producto._cantidad
+        
+        if unidades != self._total_unidades:
+            problemas.append(f"Total de unidades: {self._total_unidades}, debería ser {unidades}")
+        # El valor se acumula con sumas y restas de punto flotante, así que se admite un error de redondeo
+        if not math.isclose(valor, self._valor_total, rel_tol=1e-9, abs_tol=1e-6):
+            problemas.append(f"Valor total: {self._valor_total}, debería ser {valor}")
+        if productos_por_banda != self._productos_por_banda:
+            problemas.append(f"Productos por banda: {self._productos_por_banda}, debería ser {productos_por_banda}")
+        if unidades_por_banda != self._unidades_por_banda:
+            problemas.append(f"Unidades por banda: {self._unidades_por_banda}, debería ser {unidades_por_banda}")
+        return problemas
+    
+    def comprobar_agregados(self):
+        """Modo de depuración: falla si los totales mantenidos no coinciden con los calculados"""
+        problemas = self.verificar_agregados()
+        assert not problemas, "Agregados inconsistentes: " + "; ".join(problemas)
+    
+    def resumen(self):
+        """Obtiene los totales del inventario sin recorrer los productos
+        
+        Returns:
+            dict: Cantidad de productos, total de unidades, valor total del stock e
+                histograma por banda de precio (desde, hasta, productos y unidades)
+        """
+        limites = (0, *LIMITES_BANDAS_PRECIO, None)
+        histograma = [{'desde': limites[i], 'hasta': limites[i + 1],
+                       'productos': self._productos_por_banda[i], 'unidades': self._unidades_por_banda[i]}
+                      for i in range(len(limites) - 1)]
+        return {
+            'productos': len(self._productos),
+            'unidades': self._total_unidades,
+            'valor_total': round(self._valor_total, 2),
+            'histograma_precios': histograma,
+        }
+    
+    def marcar_modificado(self, id):
+        """Registra que un producto cambió desde el último guardado
+        
+        Args:
+            id (str): ID del producto modificado
+        """
+        if id not in self._agregados:
+            self._modificados.add(id)
+    
+    def hay_cambios(self):
+        """Indica si hay cambios sin guardar
+        
+        Returns:
+            bool: True si se agregó, modificó o eliminó algún producto desde el último guardado
+        """
+        return bool(self._agregados or self._modificados or self._eliminados)
+    
+    def limpiar_cambios(self):
+        """Olvida los cambios pendientes (se llama después de guardar o cargar)"""
+        self._agregados.clear()
+        self._modificados.clear()
+        self._eliminados.clear()
+    
     def actualizar_cantidad(self, id, nueva_cantidad):
         """Actualiza la cantidad de un producto
         
@@ -187,28 +836,39 @@ class Inventario:
             print(f"Error: {e}")
             return False
     
-    def buscar_por_nombre(self, nombre):
+    def buscar_por_nombre(self, nombre, limite=None):
         """Busca productos por nombre
         
+        Los resultados se ordenan poniendo primero las coincidencias exactas, luego los
+        nombres que empiezan con el texto buscado y después el resto, en orden alfabético.
+        
         Args:
             nombre (str): Nombre o parte del nombre a buscar
+            limite (int): Cantidad máxima de productos a devolver (None para todos)
             
         Returns:
             list: Lista de productos que coinciden con la búsqueda
         """
-        resultados = []
         nombre_lower = nombre.lower()
         
-        # Búsqueda por coincidencia exacta usando el índice
-        if nombre_lower in self._indice_nombre:
-            for id in self._indice_nombre[nombre_lower]:
-                resultados.append(self._productos[id])
+        # El índice de subcadenas devuelve solo los nombres que contienen el texto buscado
+        coincidencias = self._indice_subcadenas.candidatos(nombre_lower)
+        
+        def orden(nombre_indice):
+            return (nombre_indice != nombre_lower, not nombre_indice.startswith(nombre_lower), nombre_indice)
         
-        # Búsqueda por coincidencia parcial
-        for nombre_indice in self._indice_nombre:
-            if nombre_lower in nombre_indice and nombre_lower != nombre_indice:
-                for id in self._indice_nombre[nombre_indice]:
-                    resultados.append(self._productos[id])
+        # Con límite no hace falta ordenar todas las coincidencias, solo quedarse con las primeras
+        if limite is None:
+            nombres = sorted(coincidencias, key=orden)
+        else:
+            nombres = heapq.nsmallest(limite, coincidencias, key=orden)
+        
+        resultados = []
+        for nombre_indice in nombres:
+            for id in sorted(self._indice_nombre[nombre_indice]):
+                if limite is not None and len(resultados) >= limite:
+                    return resultados
+                resultados.append(self._productos[id])
         
         return resultados
     
@@ -231,48 +891,293 @@ class Inventario:
         """
         return list(self._productos.values())
     
-    def generar_id(self):
-        """Genera un nuevo ID único para un producto
+    def paginar(self, tamano_pagina=TAMANO_PAGINA, orden='id', cursor=None):
+        """Obtiene una página de productos ordenados, a partir de un cursor
+        
+        El cursor es la clave de orden del último producto de la página anterior, así que
+        las páginas siguen siendo correctas aunque se agreguen o eliminen productos entre
+        una llamada y otra. Cada orden tiene su índice ordenado, así que una página cuesta
+        O(log n + k) sin ordenar ni recorrer el inventario completo.
         
+        Args:
+            tamano_pagina (int): Máximo de productos por página
+            orden (str): 'id', 'nombre', 'precio' o 'cantidad'
+            cursor (tuple): Cursor devuelto por la página anterior (None para la primera)
+            
         Returns:
-            str: ID único generado
+            tuple: (lista de productos de la página, cursor de la página siguiente o None si no hay más)
         """
-        # Generar ID basado en timestamp + número aleatorio
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        if tamano_pagina < 1:
+            raise ValueError("El tamaño de página debe ser al menos 1")
+        if orden not in self.CLAVES_ORDEN:
+            raise ValueError(f"Orden desconocido: {orden}")
+        if cursor is not None:
+            cursor = tuple(cursor)
+        # Las entradas de los índices tienen el formato de las claves de CLAVES_ORDEN (el ID al
+        # final), y la página es el tramo que sigue al cursor
+        if orden == 'id':
+            # El índice de IDs guarda solo el ID: la clave es la tupla (id,)
+            claves = ((id,) for id in self._ids_ordenados.desde(None if cursor is None else cursor[0],
+                                                               incluido=False))
+        else:
+            indice = self._nombres_ordenados if orden == 'nombre' else self._indices_ordenados[orden]
+            claves = indice.desde(cursor, incluido=False)
+        # Se pide uno más para saber si existe una página siguiente
+        claves = list(islice(claves, tamano_pagina + 1))
+        pagina = [self._productos[clave[-1]] for clave in claves[:tamano_pagina]]
+        if len(claves) <= tamano_pagina:
+            return pagina, None
+        return pagina, claves[tamano_pagina - 1]
+    
+    def iterar_productos(self, orden=None, tamano_pagina=1000):
+        """Recorre los productos sin copiar el inventario completo
         
-        # Encontrar el siguiente número disponible
-        contador = 1
-        nuevo_id = f"P{timestamp}{contador:03d}"
+        Sin orden, los productos se entregan en el orden en que se agregaron y el inventario
+        no debe modificarse durante el recorrido. Con orden, se recorren página por página
+        con paginar, y se admiten cambios entre páginas.
         
-        while nuevo_id in self._ids_usados:
-            contador += 1
-            nuevo_id = f"P{timestamp}{contador:03d}"
+        Args:
+            orden (str): None, 'id', 'nombre', 'precio' o 'cantidad'
+            tamano_pagina (int): Productos por página cuando se indica un orden
+            
+        Yields:
+            Producto: Cada producto del inventario
+        """
+        if orden is None:
+            yield from self._productos.values()
+            return
+        cursor = None
+        while True:
+            pagina, cursor = self.paginar(tamano_pagina, orden, cursor)
+            yield from pagina
+            if cursor is None:
+                return
+    
+    def cantidad_productos(self):
+        """Obtiene la cantidad de productos del inventario
         
+        Returns:
+            int: Número de productos
+        """
+        return len(self._productos)
+    
+    def generar_id(self):
+        """Genera un nuevo ID único para un producto
+        
+        Returns:
+            str: ID único generado
+        """
+        # El generador no repite IDs; la comprobación solo cubre IDs cargados de un archivo
+        # que hubiera generado antes otro proceso con el mismo nodo
+        nuevo_id = self._generador_ids.siguiente()
+        while nuevo_id in self._productos:
+            nuevo_id = self._generador_ids.siguiente()
         return nuevo_id
     
-    def guardar_en_archivo(self, ruta_archivo="inventario.json"):
+    def reservar_ids(self, cantidad):
+        """Genera varios IDs únicos de una vez
+        
+        Args:
+            cantidad (int): Número de IDs a generar
+            
+        Returns:
+            list: IDs únicos generados
+        """
+        ids = self._generador_ids.reservar(cantidad)
+        if any(id in self._productos for id in ids):
+            ids = [id if id not in self._productos else self.generar_id() for id in ids]
+        return ids
+    
+    def guardar_en_archivo(self, ruta_archivo="inventario.json", formato=None):
         """Guarda el inventario en un archivo JSON
         
         Args:
             ruta_archivo (str): Ruta del archivo donde guardar
+            formato (str): "json" (un objeto con todos los productos) o "ndjson" (un producto
+                por línea, escrito sin armar el inventario completo en memoria). Si no se indica,
+                se usa el formato del último archivo cargado.
             
         Returns:
             bool: True si se guardó correctamente, False si hubo error
         """
+        formato = formato or self._formato_archivo
+        if self._ruta_archivo is None:
+            self._ruta_archivo = os.path.abspath(ruta_archivo)
         try:
-            # Convertir cada producto a diccionario
-            datos = {id: producto.to_dict() for id, producto in self._productos.items()}
+            # Se escribe en un archivo temporal que después reemplaza al anterior: si el programa
+            # se interrumpe a mitad de la escritura, el archivo anterior sigue intacto
+            temporal = ruta_archivo + ".tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                if formato == "ndjson":
+                    for producto in self._productos.values():
+                        archivo.write(json.dumps(producto.to_dict(), ensure_ascii=False))
+                        archivo.write("\n")
+                else:
+                    # Convertir cada producto a diccionario
+                    datos = {id: producto.to_dict() for id, producto in self._productos.items()}
+                    json.dump(datos, archivo, indent=4, ensure_ascii=False)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, ruta_archivo)
             
-            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4, ensure_ascii=False)
+            if not self.es_archivo_base(ruta_archivo):
+                # Una copia o exportación: los cambios siguen pendientes para el archivo base
+                return True
+            self._formato_archivo = formato
             
+            # El archivo completo ya incluye todas las diferencias pendientes. Si el programa se
+            # interrumpe antes de borrarlas, al cargar se aplican sobre el archivo nuevo seguidas del
+            # WAL (que todavía no se vació), y el resultado es el mismo estado que se acaba de guardar
+            if os.path.exists(ruta_archivo + ".delta"):
+                os.remove(ruta_archivo + ".delta")
+            self._registros_delta = 0
+            self.limpiar_cambios()
+            self.vaciar_wal(ruta_archivo)
             return True
         except Exception as e:
             print(f"Error al guardar el inventario: {e}")
             return False
     
+    def guardar_cambios(self, ruta_archivo="inventario.json", umbral_delta=1000):
+        """Guarda solo los productos que cambiaron desde el último guardado
+        
+        Los cambios se agregan al final de un archivo de diferencias (ruta_archivo + ".delta",
+        un registro NDJSON por producto). El archivo completo solo se reescribe cuando todavía
+        no existe o cuando las diferencias acumuladas superan umbral_delta registros.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base del inventario
+            umbral_delta (int): Registros de diferencias a partir de los cuales se reescribe el archivo base
+            
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        pendientes = len(self._agregados) + len(self._modificados) + len(self._eliminados)
+        if (not os.path.exists(ruta_archivo) or not self.es_archivo_base(ruta_archivo)
+                or self._registros_delta + pendientes > umbral_delta):
+            # Las diferencias solo sirven para el archivo base; cualquier otro se escribe completo
+            return self.guardar_en_archivo(ruta_archivo)
+        if not pendientes:
+            return True
+        
+        try:
+            with open(ruta_archivo + ".delta", 'a', encoding='utf-8') as archivo:
+                for id in self._agregados | self._modificados:
+                    registro = {'op': 'put', 'producto': self._productos[id].to_dict()}
+                    archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                for id in self._eliminados:
+                    archivo.write(json.dumps({'op': 'del', 'id': id}, ensure_ascii=False) + "\n")
+                # Las diferencias tienen que estar en el disco antes de vaciar el WAL
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            
+            self._registros_delta += pendientes
+            self.limpiar_cambios()
+            self.vaciar_wal(ruta_archivo)
+            return True
+        except Exception as e:
+            print(f"Error al guardar los cambios del inventario: {e}")
+            return False
+    
+    def es_archivo_base(self, ruta_archivo):
+        """Indica si una ruta es el archivo base del inventario
+        
+        Args:
+            ruta_archivo (str): Ruta a comparar
+            
+        Returns:
+            bool: True si es el archivo base (o si todavía no hay ninguno)
+        """
+        return self._ruta_archivo is None or os.path.abspath(ruta_archivo) == self._ruta_archivo
+    
+    def aplicar_delta(self, ruta_delta):
+        """Aplica sobre el inventario los registros de un archivo de diferencias
+        
+        Si el último registro quedó a medio escribir (el programa se interrumpió mientras se
+        guardaba), se descarta y se recorta del archivo: esos cambios siguen en el WAL.
+        
+        Args:
+            ruta_delta (str): Ruta del archivo de diferencias
+        """
+        self._registros_delta = 0
+        if not os.path.exists(ruta_delta):
+            return
+        
+        posicion = 0
+        with open(ruta_delta, 'rb') as archivo:
+            for linea in archivo:
+                if linea.strip():
+                    try:
+                        if not linea.endswith(b"\n"):
+                            raise ValueError("registro incompleto")
+                        registro = json.loads(linea)
+                    except ValueError:
+                        break
+                    self.aplicar_registro(registro)
+                    self._registros_delta += 1
+                posicion += len(linea)
+        self.recortar_archivo(ruta_delta, posicion)
+    
+    def aplicar_registro(self, registro):
+        """Aplica un registro de cambio del archivo de diferencias o del WAL
+        
+        Un registro 'put' trae el producto completo y uno 'del' solo el ID, así que aplicar
+        un registro que ya estaba aplicado deja el inventario igual.
+        
+        Args:
+            registro (dict): {'op': 'put', 'producto': {...}} o {'op': 'del', 'id': ...}
+        """
+        if registro['op'] == 'put':
+            producto = Producto.from_dict(registro['producto'])
+            self.eliminar_producto(producto.id)
+            self.agregar_producto(producto)
+        elif registro['op'] == 'del':
+            self.eliminar_producto(str(registro['id']))
+    
+    @staticmethod
+    def recortar_archivo(ruta, longitud):
+        """Descarta lo que sigue a los primeros longitud bytes de un archivo (un final dañado)
+        
+        Args:
+            ruta (str): Ruta del archivo
+            longitud (int): Bytes válidos del principio del archivo
+        """
+        if os.path.getsize(ruta) > longitud:
+            print(f"Se descartó un registro incompleto al final de {ruta}")
+            with open(ruta, 'r+b') as archivo:
+                archivo.truncate(longitud)
+                os.fsync(archivo.fileno())
+    
+    @staticmethod
+    def detectar_formato(ruta_archivo):
+        """Detecta si un archivo de inventario está en formato JSON o NDJSON
+        
+        En NDJSON la primera línea ya es un producto completo; en el JSON clásico
+        la primera línea es solo "{" o un objeto cuyos valores son productos.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo a revisar
+            
+        Returns:
+            str: "ndjson" o "json"
+        """
+        with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                if linea.strip():
+                    break
+            else:
+                return "ndjson"  # Un archivo vacío es un inventario NDJSON sin productos
+        try:
+            primero = json.loads(linea)
+        except json.JSONDecodeError:
+            return "json"
+        return "ndjson" if isinstance(primero, dict) and 'nombre' in primero else "json"
+    
     def cargar_desde_archivo(self, ruta_archivo="inventario.json"):
-        """Carga el inventario desde un archivo JSON
+        """Carga el inventario desde un archivo JSON o NDJSON (el formato se detecta solo)
+        
+        Si existe un archivo de diferencias (ruta_archivo + ".delta"), se aplica
+        después del archivo base.
         
         Args:
             ruta_archivo (str): Ruta del archivo desde donde cargar
@@ -281,41 +1186,435 @@ class Inventario:
             bool: True si se cargó correctamente, False si hubo error
         """
         try:
+            self._ruta_archivo = os.path.abspath(ruta_archivo)
             if not os.path.exists(ruta_archivo):
                 print(f"El archivo {ruta_archivo} no existe. Se creará un inventario vacío.")
                 return True
             
+            formato = self.detectar_formato(ruta_archivo)
+            
+            with self.wal_suspendido():
+                self.cargar_productos(ruta_archivo, formato)
+            self.limpiar_cambios()
+            
+            self._formato_archivo = formato
+            return True
+        except Exception as e:
+            # Sin productos a medio cargar: los índices y los totales quedan coincidiendo con el inventario
+            self.vaciar_productos()
+            self.limpiar_cambios()
+            print(f"Error al cargar el inventario: {e}")
+            return False
+    
+    def vaciar_productos(self):
+        """Quita todos los productos, con sus índices y totales"""
+        self._productos.clear()
+        self._indice_nombre.clear()
+        self._indice_subcadenas.reconstruir([])
+        for lista in self._indices_ordenados.values():
+            lista.limpiar()
+        self._ids_ordenados.limpiar()
+        self._nombres_ordenados.limpiar()
+        self.recalcular_agregados()
+    
+    def cargar_productos(self, ruta_archivo, formato):
+        """Reemplaza los productos del inventario por los del archivo base y su archivo de diferencias
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base
+            formato (str): "json" o "ndjson"
+        """
+        # Limpiar inventario actual
+        self.vaciar_productos()
+        
+        if formato == "ndjson":
+            # Se lee un producto por línea, sin cargar el archivo completo en memoria
+            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+                lote = []
+                for linea in archivo:
+                    if linea.strip():
+                        lote.append(Producto.from_dict(json.loads(linea)))
+                        if len(lote) >= TAMANO_LOTE_CARGA:
+                            self.agregar_en_bloque(lote)
+                            lote = []
+                self.agregar_en_bloque(lote)
+        else:
             with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
                 datos = json.load(archivo)
             
-            # Limpiar inventario actual
-            self._productos.clear()
-            self._ids_usados.clear()
-            self._indice_nombre.clear()
-            
             # Cargar productos desde el archivo
-            for id, datos_producto in datos.items():
-                producto = Producto.from_dict(datos_producto)
-                self.agregar_producto(producto)
+            self.agregar_en_bloque([Producto.from_dict(datos_producto) for datos_producto in datos.values()])
+        
+        # Aplicar las diferencias guardadas después de la última reescritura completa
+        self.aplicar_delta(ruta_archivo + ".delta")
+    
+    
+    def guardar_snapshot(self, ruta_snapshot="inventario.json.snap", ruta_archivo=None):
+        """Guarda una instantánea binaria del inventario para arrancar más rápido
+        
+        La instantánea guarda los productos por columnas junto con los índices ya
+        construidos, serializados con marshal. Lleva una cabecera con versión, un
+        CRC32 de los datos y la firma (tamaño y fecha) del archivo base y de su archivo
+        de diferencias, y se escribe en un archivo temporal que luego reemplaza al
+        anterior, así nunca queda una instantánea a medio escribir. Solo se guarda si no
+        hay cambios pendientes: la instantánea tiene que coincidir con esos archivos.
+        
+        Args:
+            ruta_snapshot (str): Ruta del archivo de instantánea
+            ruta_archivo (str): Archivo base al que corresponde la instantánea; si no se
+                indica, es ruta_snapshot sin la extensión .snap
             
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error o cambios sin guardar
+        """
+        if self.hay_cambios():
+            print("No se guardó la instantánea: hay cambios sin guardar en el archivo del inventario.")
+            return False
+        if ruta_archivo is None:
+            ruta_archivo = ruta_snapshot[:-len(".snap")] if ruta_snapshot.endswith(".snap") else ruta_snapshot
+        try:
+            productos = self._productos.values()
+            datos = marshal.dumps((
+                [producto._id for producto in productos],
+                [producto._nombre for producto in productos],
+                [producto._cantidad for producto in productos],
+                [producto._precio for producto in productos],
+                self._indice_nombre,
+                self._indice_subcadenas.trigramas,
+                self._indice_subcadenas.nombres,
+                {campo: list(lista) for campo, lista in self._indices_ordenados.items()},
+                list(self._ids_ordenados),
+                list(self._nombres_ordenados),
+                self._formato_archivo,
+                self._registros_delta,
+            ))
+            cabecera = CABECERA_SNAPSHOT.pack(MARCA_SNAPSHOT, VERSION_SNAPSHOT, zlib.crc32(datos), len(datos),
+                                              *self.firma_archivos(ruta_archivo))
+            
+            temporal = ruta_snapshot + ".tmp"
+            with open(temporal, 'wb') as archivo:
+                archivo.write(cabecera)
+                archivo.write(datos)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, ruta_snapshot)
             return True
         except Exception as e:
-            print(f"Error al cargar el inventario: {e}")
+            print(f"Error al guardar la instantánea del inventario: {e}")
+            return False
+    
+    def cargar_snapshot(self, ruta_snapshot="inventario.json.snap", ruta_archivo=None):
+        """Carga el inventario desde una instantánea binaria
+        
+        Si la instantánea no existe, es de otra versión o no pasa la verificación del
+        CRC32, el inventario queda sin cambios y se devuelve False.
+        
+        Args:
+            ruta_snapshot (str): Ruta del archivo de instantánea
+            ruta_archivo (str): Archivo base al que corresponde la instantánea; si no se
+                indica, es ruta_snapshot sin la extensión .snap
+            
+        Returns:
+            bool: True si se cargó correctamente, False si no se pudo usar
+        """
+        try:
+            with open(ruta_snapshot, 'rb') as archivo:
+                cabecera = archivo.read(CABECERA_SNAPSHOT.size)
+                if len(cabecera) < CABECERA_SNAPSHOT.size:
+                    return False
+                marca, version, crc, longitud, *_ = CABECERA_SNAPSHOT.unpack(cabecera)
+                if marca != MARCA_SNAPSHOT or version != VERSION_SNAPSHOT:
+                    return False
+                datos = archivo.read(longitud)
+            if len(datos) != longitud or zlib.crc32(datos) != crc:
+                return False
+        except OSError:
             return False
+        
+        # Se crean millones de objetos que no forman ciclos: el recolector de basura solo
+        # los recorrería una y otra vez, así que se suspende durante la carga
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            try:
+                (ids, nombres, cantidades, precios, indice_nombre, trigramas, nombres_indice,
+                 indices_ordenados, ids_ordenados, nombres_ordenados, formato, registros_delta) = marshal.loads(datos)
+            except (ValueError, EOFError, TypeError):
+                return False
+            
+            aviso = self._aviso_cambios
+            productos = {}
+            for id, nombre, cantidad, precio in zip(ids, nombres, cantidades, precios):
+                producto = Producto(id, nombre, cantidad, precio)
+                producto._observador = aviso
+                productos[id] = producto
+        finally:
+            if recolector_activo:
+                gc.enable()
+        
+        for producto in self._productos.values():
+            producto._observador = None
+        self._productos = productos
+        self._indice_nombre = indice_nombre
+        self._indice_subcadenas.trigramas = trigramas
+        self._indice_subcadenas.nombres = nombres_indice
+        for campo, pares in indices_ordenados.items():
+            self._indices_ordenados[campo].reemplazar(pares)
+        self._ids_ordenados.reemplazar(ids_ordenados)
+        self._nombres_ordenados.reemplazar(nombres_ordenados)
+        self.recalcular_agregados()
+        self._formato_archivo = formato
+        self._registros_delta = registros_delta
+        if ruta_archivo is None and ruta_snapshot.endswith(".snap"):
+            ruta_archivo = ruta_snapshot[:-len(".snap")]
+        self._ruta_archivo = os.path.abspath(ruta_archivo) if ruta_archivo is not None else None
+        self.limpiar_cambios()
+        return True
+    
+    @staticmethod
+    def snapshot_vigente(ruta_archivo, ruta_snapshot):
+        """Indica si la instantánea corresponde al estado actual del archivo base y sus diferencias
+        
+        Compara la firma guardada en la cabecera de la instantánea con el tamaño y la fecha
+        de modificación actuales del archivo base y de su archivo de diferencias.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base del inventario
+            ruta_snapshot (str): Ruta del archivo de instantánea
+            
+        Returns:
+            bool: True si la instantánea existe y ninguno de los otros archivos cambió desde que se guardó
+        """
+        try:
+            with open(ruta_snapshot, 'rb') as archivo:
+                cabecera = archivo.read(CABECERA_SNAPSHOT.size)
+            if len(cabecera) < CABECERA_SNAPSHOT.size:
+                return False
+            marca, version, _, _, *firma = CABECERA_SNAPSHOT.unpack(cabecera)
+            return (marca == MARCA_SNAPSHOT and version == VERSION_SNAPSHOT
+                    and tuple(firma) == Inventario.firma_archivos(ruta_archivo))
+        except OSError:
+            return False
+    
+    @staticmethod
+    def firma_archivos(ruta_archivo):
+        """Tamaño y fecha de modificación del archivo base y de su archivo de diferencias
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base del inventario
+            
+        Returns:
+            tuple: (tamaño, fecha) del archivo base seguidos de los del archivo de diferencias;
+                (-1, -1) para el que no exista
+        """
+        firma = []
+        for ruta in (ruta_archivo, ruta_archivo + ".delta"):
+            try:
+                estado = os.stat(ruta)
+                firma.extend((estado.st_size, estado.st_mtime_ns))
+            except FileNotFoundError:
+                firma.extend((-1, -1))
+        return tuple(firma)
+    
+    def activar_wal(self, ruta_archivo="inventario.json", fsync="siempre"):
+        """Empieza a anotar cada cambio del inventario en un registro de escritura anticipada
+        
+        Antes de aplicar un cambio se agrega al final de ruta_archivo + ".wal" un registro con
+        su CRC32. Si el programa se interrumpe antes de guardar, recuperar_wal rehace esos
+        cambios al iniciar. El WAL se vacía cada vez que se guarda en ruta_archivo.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base del inventario
+            fsync (str): "siempre" (se sincroniza con el disco en cada cambio), "lote" (solo al
+                llamar a sincronizar_wal) o "nunca" (lo decide el sistema operativo)
+        """
+        if fsync not in POLITICAS_FSYNC_WAL:
+            raise ValueError(f"Política de fsync desconocida: {fsync}")
+        self.cerrar_wal()
+        # Sin búfer: cada registro llega al sistema operativo al escribirse, y si la escritura
+        # falla no queda nada en memoria esperando a reintentarse en la siguiente
+        self._wal = open(ruta_archivo + ".wal", 'ab', buffering=0)
+        self._ruta_wal = ruta_archivo + ".wal"
+        self._fsync_wal = fsync
+    
+    def cerrar_wal(self):
+        """Deja de anotar los cambios en el WAL y cierra su archivo"""
+        if self._wal is not None:
+            self._wal.close()
+        self._wal = None
+        self._ruta_wal = None
+    
+    @contextlib.contextmanager
+    def wal_suspendido(self):
+        """Dentro del bloque los cambios no se anotan en el WAL (cargas y recuperación)"""
+        wal, self._wal = self._wal, None
+        try:
+            yield
+        finally:
+            self._wal = wal
+    
+    def registrar_en_wal(self, registros):
+        """Agrega registros de cambio al final del WAL
+        
+        Cada línea es el CRC32 del registro en hexadecimal, un espacio y el registro en JSON.
+        Si la escritura falla, el WAL queda como estaba y el cambio no debe aplicarse.
+        
+        Args:
+            registros (list): Registros con el mismo formato que los del archivo de diferencias
+            
+        Raises:
+            OSError: Si no se pudo escribir el WAL (por ejemplo, con el disco lleno)
+        """
+        lineas = []
+        for registro in registros:
+            datos = json.dumps(registro, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            lineas.append(b"%08x %s\n" % (zlib.crc32(datos), datos))
+        longitud = self.longitud_wal()
+        try:
+            pendiente = memoryview(b"".join(lineas))
+            while pendiente:
+                pendiente = pendiente[self._wal.write(pendiente):]
+            if self._fsync_wal == "siempre":
+                os.fsync(self._wal.fileno())
+        except OSError:
+            # Se quita lo que llegó a escribirse: la recuperación se detiene en la primera línea
+            # cortada, así que los registros siguientes quedarían detrás de ella y se perderían
+            with contextlib.suppress(OSError):
+                self.recortar_wal(longitud)
+            raise
+    
+    def longitud_wal(self):
+        """Obtiene el tamaño actual del WAL en bytes (None si no está activo)"""
+        if self._wal is None:
+            return None
+        return os.fstat(self._wal.fileno()).st_size
+    
+    def recortar_wal(self, longitud):
+        """Descarta los registros del WAL escritos después de los primeros longitud bytes
+        
+        Sirve para quitar los registros de cambios que se deshicieron porque no llegaron al disco.
+        
+        Args:
+            longitud (int): Tamaño que tenía el WAL antes de esos registros (ver longitud_wal)
+        """
+        if self._wal is not None and longitud is not None:
+            self._wal.truncate(longitud)
+    
+    def sincronizar_wal(self):
+        """Lleva al disco los registros del WAL escritos hasta ahora (para la política "lote")"""
+        if self._wal is not None:
+            os.fsync(self._wal.fileno())
+    
+    def vaciar_wal(self, ruta_archivo):
+        """Vacía el WAL después de guardar: sus cambios ya están en el archivo del inventario
+        
+        Args:
+            ruta_archivo (str): Archivo que se acaba de guardar; si es otro (una copia, una
+                exportación) el WAL se conserva
+        """
+        if self._wal is not None and self._ruta_wal == ruta_archivo + ".wal":
+            self._wal.truncate(0)
+            if self._fsync_wal != "nunca":
+                os.fsync(self._wal.fileno())
+    
+    def recuperar_wal(self, ruta_archivo="inventario.json"):
+        """Rehace los cambios del WAL que no llegaron a guardarse
+        
+        Se llama después de cargar el archivo o la instantánea. Los registros se aplican en
+        orden hasta el primero incompleto o con el CRC32 incorrecto (la escritura que cortó la
+        interrupción) y el archivo se recorta ahí. Los cambios recuperados quedan pendientes
+        para el próximo guardado.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo base del inventario
+            
+        Returns:
+            int: Cantidad de registros aplicados
+        """
+        ruta_wal = ruta_archivo + ".wal"
+        if not os.path.exists(ruta_wal):
+            return 0
+        
+        aplicados = 0
+        posicion = 0
+        with self.wal_suspendido(), open(ruta_wal, 'rb') as archivo:
+            for linea in archivo:
+                crc, _, datos = linea.rstrip(b"\n").partition(b" ")
+                try:
+                    if not linea.endswith(b"\n") or int(crc, 16) != zlib.crc32(datos):
+                        break
+                    registro = json.loads(datos)
+                except ValueError:
+                    break
+                self.aplicar_registro(registro)
+                aplicados += 1
+                posicion += len(linea)
+        self.recortar_archivo(ruta_wal, posicion)
+        return aplicados
 
 
 class SistemaInventario:
     """Clase principal para gestionar el sistema de inventario"""
     
-    def __init__(self, ruta_archivo="inventario.json"):
+    # Argumentos posicionales de cada comando del modo no interactivo, en orden
+    ARGUMENTOS_COMANDOS = {
+        'add': ('nombre', 'cantidad', 'precio', 'id'),
+        'delete': ('id',),
+        'set-qty': ('id', 'cantidad'),
+        'set-price': ('id', 'precio'),
+        'search': ('texto', 'limite'),
+        'list': ('orden', 'limite'),
+        'summary': (),
+        'save': (),
+    }
+    
+    def __init__(self, ruta_archivo="inventario.json", formato_archivo=None, umbral_delta=1000, usar_snapshot=True,
+                 backend=None, usar_wal=True, fsync_wal="siempre"):
         """Constructor de la clase SistemaInventario
         
         Args:
             ruta_archivo (str): Ruta del archivo de inventario
+            formato_archivo (str): "json" o "ndjson"; si no se indica, se conserva
+                el formato del archivo existente
+            umbral_delta (int): Cambios acumulados en el archivo de diferencias a partir
+                de los cuales se reescribe el archivo completo
+            usar_snapshot (bool): Si es True, al salir se guarda una instantánea binaria
+                (ruta_archivo + ".snap") y al iniciar se carga si es más nueva que el archivo
+            backend (str): "json" (productos en memoria y archivo JSON) o "sqlite" (base de datos
+                SQLite en ruta_archivo). Si no se indica, se usa SQLite para las rutas terminadas
+                en .db, .sqlite o .sqlite3
+            usar_wal (bool): Si es True (solo con el backend "json"), cada cambio se anota en
+                ruta_archivo + ".wal" y al iniciar se rehacen los que no llegaron a guardarse.
+                Con "sqlite" no hace falta: cada cambio se confirma en la base al hacerse
+            fsync_wal (str): Cuándo se sincroniza el WAL con el disco: "siempre", "lote" o "nunca"
+                (ver Inventario.activar_wal)
         """
-        self.inventario = Inventario()
         self.ruta_archivo = ruta_archivo
-        self.inventario.cargar_desde_archivo(ruta_archivo)
+        self.formato_archivo = formato_archivo
+        self.umbral_delta = umbral_delta
+        self.backend = backend or ("sqlite" if ruta_archivo.lower().endswith(EXTENSIONES_SQLITE) else "json")
+        if self.backend == "sqlite":
+            # Importación diferida: semana11_sqlite importa este módulo
+            from semana11_sqlite import InventarioSQLite
+            # Sin WAL propio: InventarioSQLite confirma cada cambio en cuanto se hace, y es el
+            # registro de SQLite el que lo protege ante una interrupción
+            self.inventario = InventarioSQLite(ruta_archivo)
+            self.ruta_snapshot = None
+            return
+        if self.backend != "json":
+            raise ValueError(f"Backend desconocido: {backend}")
+        
+        self.inventario = Inventario()
+        self.ruta_snapshot = ruta_archivo + ".snap" if usar_snapshot else None
+        if not (self.ruta_snapshot and Inventario.snapshot_vigente(ruta_archivo, self.ruta_snapshot)
+                and self.inventario.cargar_snapshot(self.ruta_snapshot, ruta_archivo)):
+            self.inventario.cargar_desde_archivo(ruta_archivo)
+        if usar_wal:
+            # Rehacer los cambios que quedaron sin guardar si el programa se interrumpió
+            recuperados = self.inventario.recuperar_wal(ruta_archivo)
+            if recuperados:
+                print(f"Se recuperaron {recuperados} cambios sin guardar del registro {ruta_archivo}.wal")
+            self.inventario.activar_wal(ruta_archivo, fsync_wal)
     
     def mostrar_menu(self):
         """Muestra el menú principal del sistema"""
@@ -328,37 +1627,53 @@ class SistemaInventario:
         print("4. Actualizar precio de un producto")
         print("5. Buscar productos por nombre")
         print("6. Mostrar todos los productos")
-        print("7. Guardar inventario")
-        print("8. Salir")
+        print("7. Reporte de productos con stock bajo")
+        print("8. Resumen del inventario")
+        print("9. Guardar inventario")
+        print("10. Salir")
         print("="*50)
     
     def ejecutar(self):
         """Ejecuta el sistema de inventario"""
         while True:
             self.mostrar_menu()
-            opcion = input("Seleccione una opción (1-8): ")
-            
-            if opcion == "1":
-                self.agregar_producto()
-            elif opcion == "2":
-                self.eliminar_producto()
-            elif opcion == "3":
-                self.actualizar_cantidad()
-            elif opcion == "4":
-                self.actualizar_precio()
-            elif opcion == "5":
-                self.buscar_por_nombre()
-            elif opcion == "6":
-                self.mostrar_todos()
-            elif opcion == "7":
-                self.guardar_inventario()
-            elif opcion == "8":
-                self.guardar_inventario()
-                print("\nGuardando inventario antes de salir...")
-                print("¡Gracias por usar el Sistema de Gestión de Inventario!")
-                break
-            else:
-                print("\nOpción no válida. Por favor, intente de nuevo.")
+            opcion = input("Seleccione una opción (1-10): ")
+            
+            # Un cambio que no se pudo anotar en el WAL (disco lleno, por ejemplo) o escribir en la
+            # base de datos (bloqueada por otro proceso) no se aplica: se informa y se sigue con el menú
+            try:
+                if opcion == "1":
+                    self.agregar_producto()
+                elif opcion == "2":
+                    self.eliminar_producto()
+                elif opcion == "3":
+                    self.actualizar_cantidad()
+                elif opcion == "4":
+                    self.actualizar_precio()
+                elif opcion == "5":
+                    self.buscar_por_nombre()
+                elif opcion == "6":
+                    self.mostrar_todos()
+                elif opcion == "7":
+                    self.reporte_stock_bajo()
+                elif opcion == "8":
+                    self.mostrar_resumen()
+                elif opcion == "9":
+                    self.guardar_inventario()
+                elif opcion == "10":
+                    # La instantánea se guarda después del archivo, y solo si se pudo guardar: tiene que
+                    # coincidir con lo que hay en disco para que el próximo inicio la encuentre vigente
+                    if self.guardar_inventario() and self.ruta_snapshot:
+                        self.inventario.guardar_snapshot(self.ruta_snapshot, self.ruta_archivo)
+                    print("\nGuardando inventario antes de salir...")
+                    print("¡Gracias por usar el Sistema de Gestión de Inventario!")
+                    break
+                else:
+                    print("\nOpción no válida. Por favor, intente de nuevo.")
+            except OSError as e:
+                print(f"\nError: no se pudo registrar el cambio en el disco ({e}). El inventario no se modificó.")
+            except sqlite3.Error as e:
+                print(f"\nError en la base de datos: {e}. El inventario no se modificó.")
     
     def agregar_producto(self):
         """Agrega un nuevo producto al inventario"""
@@ -478,10 +1793,15 @@ class SistemaInventario:
         print("\n----- BUSCAR PRODUCTOS POR NOMBRE -----")
         nombre = input("Ingrese el nombre o parte del nombre a buscar: ")
         
-        resultados = self.inventario.buscar_por_nombre(nombre)
+        # Se pide un resultado más que el límite solo para saber si hay más coincidencias
+        resultados = self.inventario.buscar_por_nombre(nombre, limite=LIMITE_BUSQUEDA + 1)
         
         if resultados:
-            print(f"\nSe encontraron {len(resultados)} productos:")
+            if len(resultados) > LIMITE_BUSQUEDA:
+                resultados = resultados[:LIMITE_BUSQUEDA]
+                print(f"\nSe muestran los primeros {LIMITE_BUSQUEDA} productos (afine la búsqueda para ver otros):")
+            else:
+                print(f"\nSe encontraron {len(resultados)} productos:")
             for i, producto in enumerate(resultados, 1):
                 print(f"{i}. {producto}")
         else:
@@ -490,25 +1810,284 @@ class SistemaInventario:
     def mostrar_todos(self):
         """Muestra todos los productos en el inventario"""
         print("\n----- TODOS LOS PRODUCTOS EN INVENTARIO -----")
-        productos = self.inventario.listar_productos()
-        
-        if productos:
-            print(f"\nTotal de productos: {len(productos)}")
-            for i, producto in enumerate(productos, 1):
-                print(f"{i}. {producto}")
-        else:
+        total = self.inventario.cantidad_productos()
+        if not total:
             print("\nEl inventario está vacío.")
+            return
+        
+        ordenes = {"1": "id", "2": "nombre", "3": "precio", "4": "cantidad"}
+        opcion = input("Ordenar por: 1) ID  2) Nombre  3) Precio  4) Cantidad [1]: ").strip() or "1"
+        orden = ordenes.get(opcion, "id")
+        
+        print(f"\nTotal de productos: {total}")
+        numero = 0
+        cursor = None
+        while True:
+            pagina, cursor = self.inventario.paginar(TAMANO_PAGINA, orden, cursor)
+            for producto in pagina:
+                numero += 1
+                print(f"{numero}. {producto}")
+            if cursor is None:
+                break
+            respuesta = input(f"-- Mostrados {numero} de {total}. Enter para continuar, 'q' para volver: ")
+            if respuesta.strip().lower() == "q":
+                break
+    
+    def reporte_stock_bajo(self):
+        """Muestra los productos cuya cantidad está por debajo del nivel de reposición"""
+        print("\n----- REPORTE DE STOCK BAJO -----")
+        respuesta = input(f"Nivel de reposición [{NIVEL_REPOSICION}]: ").strip()
+        try:
+            nivel = int(respuesta) if respuesta else NIVEL_REPOSICION
+        except ValueError:
+            print("Por favor, ingrese un número entero válido.")
+            return
+        
+        productos = self.inventario.productos_bajo_stock(nivel)
+        if not productos:
+            print(f"\nNo hay productos con menos de {nivel} unidades.")
+            return
+        print(f"\n{len(productos)} productos con menos de {nivel} unidades (de menor a mayor cantidad):")
+        for i, producto in enumerate(productos[:LIMITE_BUSQUEDA], 1):
+            print(f"{i}. {producto}")
+        if len(productos) > LIMITE_BUSQUEDA:
+            print(f"... y {len(productos) - LIMITE_BUSQUEDA} productos más.")
+    
+    def mostrar_resumen(self):
+        """Muestra los totales del inventario y el histograma por banda de precio"""
+        print("\n----- RESUMEN DEL INVENTARIO -----")
+        resumen = self.inventario.resumen()
+        print(f"Productos: {resumen['productos']}")
+        print(f"Unidades en stock: {resumen['unidades']}")
+        print(f"Valor total del stock: ${resumen['valor_total']:.2f}")
+        print("\nProductos por banda de precio:")
+        for banda in resumen['histograma_precios']:
+            hasta = f"${banda['hasta']}" if banda['hasta'] is not None else "en adelante"
+            print(f"  ${banda['desde']} - {hasta}: {banda['productos']} productos, {banda['unidades']} unidades")
     
     def guardar_inventario(self):
-        """Guarda el inventario en el archivo"""
+        """Guarda los cambios del inventario en el archivo
+        
+        Returns:
+            bool: True si se guardó correctamente
+        """
         print("\nGuardando inventario...")
-        if self.inventario.guardar_en_archivo(self.ruta_archivo):
+        if (self.backend == "json" and self.formato_archivo
+                and self.formato_archivo != self.inventario._formato_archivo):
+            # Cambiar de formato obliga a reescribir el archivo completo
+            guardado = self.inventario.guardar_en_archivo(self.ruta_archivo, self.formato_archivo)
+        else:
+            guardado = self.inventario.guardar_cambios(self.ruta_archivo, self.umbral_delta)
+        if guardado:
             print(f"Inventario guardado exitosamente en '{self.ruta_archivo}'.")
         else:
             print("Error: No se pudo guardar el inventario.")
+        return guardado
+    
+    @classmethod
+    def interpretar_comando(cls, linea):
+        """Convierte una línea de comando en un diccionario
+        
+        La línea puede ser un objeto JSON ({"op": "add", "nombre": "Pan", ...}) o texto
+        con el comando seguido de sus argumentos en orden (add "Pan dulce" 10 2.5).
+        
+        Args:
+            linea (str): Línea a interpretar
+            
+        Returns:
+            dict: Comando con la clave 'op' y sus argumentos por nombre
+        """
+        linea = linea.strip()
+        if linea.startswith('{'):
+            comando = json.loads(linea)
+            if not isinstance(comando, dict) or 'op' not in comando:
+                raise ValueError("El comando JSON debe tener la clave 'op'")
+            return comando
+        partes = shlex.split(linea)
+        if not partes:
+            raise ValueError("Comando vacío")
+        return cls.armar_comando(partes)
+    
+    @classmethod
+    def armar_comando(cls, partes):
+        """Arma un comando a partir de su nombre y sus argumentos posicionales
+        
+        Args:
+            partes (list): Nombre del comando seguido de sus argumentos
+            
+        Returns:
+            dict: Comando con la clave 'op' y sus argumentos por nombre
+        """
+        op, argumentos = partes[0], partes[1:]
+        nombres = cls.ARGUMENTOS_COMANDOS.get(op)
+        if nombres is None:
+            raise ValueError(f"Comando desconocido: {op}")
+        if len(argumentos) > len(nombres):
+            raise ValueError(f"Demasiados argumentos para {op}: se esperan {' '.join(nombres) or 'ninguno'}")
+        comando = dict(zip(nombres, argumentos))
+        comando['op'] = op
+        return comando
+    
+    @staticmethod
+    def convertir_numero(comando, campo, tipo):
+        """Convierte un argumento de un comando a número, con un mensaje de error claro"""
+        valor = comando[campo]
+        try:
+            return tipo(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor inválido para {campo}: {valor!r}") from None
+    
+    def ejecutar_comando(self, comando):
+        """Ejecuta un comando sobre el inventario, sin pedir datos por consola
+        
+        Args:
+            comando (dict): Comando con la clave 'op' y sus argumentos por nombre
+            
+        Returns:
+            Resultado del comando, que se puede convertir a JSON
+            
+        Raises:
+            ValueError: Si el comando o sus argumentos no son válidos
+            KeyError: Si falta un argumento obligatorio
+        """
+        op = comando['op']
+        inventario = self.inventario
+        
+        if op == 'add':
+            id = str(comando.get('id') or inventario.generar_id())
+            producto = Producto(id, str(comando['nombre']), 0, 1.0)
+            # Los setters validan la cantidad y el precio
+            producto.cantidad = self.convertir_numero(comando, 'cantidad', int)
+            producto.precio = self.convertir_numero(comando, 'precio', float)
+            if not inventario.agregar_producto(producto):
+                raise ValueError(f"El ID {id} ya existe")
+            return producto.to_dict()
+        
+        if op == 'delete':
+            if not inventario.eliminar_producto(comando['id']):
+                raise ValueError(f"No existe el producto {comando['id']}")
+            return {'id': comando['id']}
+        
+        if op in ('set-qty', 'set-price'):
+            producto = inventario.obtener_producto(comando['id'])
+            if producto is None:
+                raise ValueError(f"No existe el producto {comando['id']}")
+            if op == 'set-qty':
+                producto.cantidad = self.convertir_numero(comando, 'cantidad', int)
+            else:
+                producto.precio = self.convertir_numero(comando, 'precio', float)
+            return producto.to_dict()
+        
+        if op == 'search':
+            limite = self.convertir_numero(comando, 'limite', int) if comando.get('limite') is not None else None
+            if limite is not None and limite < 1:
+                raise ValueError(f"Valor inválido para limite: {comando['limite']!r} (debe ser al menos 1)")
+            productos = inventario.buscar_por_nombre(str(comando['texto']), limite=limite)
+            return [producto.to_dict() for producto in productos]
+        
+        if op == 'list':
+            orden = comando.get('orden') or 'id'
+            if comando.get('limite') is None:
+                return {'productos': [producto.to_dict() for producto in inventario.iterar_productos(orden)],
+                        'cursor': None}
+            limite = self.convertir_numero(comando, 'limite', int)
+            if limite < 1:
+                raise ValueError(f"Valor inválido para limite: {comando['limite']!r} (debe ser al menos 1)")
+            productos, cursor = inventario.paginar(limite, orden, comando.get('cursor'))
+            return {'productos': [producto.to_dict() for producto in productos],
+                    'cursor': list(cursor) if cursor is not None else None}
+        
+        if op == 'summary':
+            return inventario.resumen()
+        
+        if op == 'save':
+            if not inventario.guardar_cambios(self.ruta_archivo, self.umbral_delta):
+                raise ValueError("No se pudo guardar el inventario")
+            return {'archivo': self.ruta_archivo}
+        
+        raise ValueError(f"Comando desconocido: {op}")
+    
+    def ejecutar_comandos(self, lineas, salida, detener_en_error=False):
+        """Ejecuta una serie de comandos y escribe un resultado JSON por línea en la salida
+        
+        Args:
+            lineas: Líneas de comandos (las vacías y las que empiezan con # se ignoran)
+            salida: Archivo de texto donde escribir los resultados
+            detener_en_error (bool): Si es True, se detiene en el primer comando que falle
+            
+        Returns:
+            int: Código de salida (0 si todos los comandos se ejecutaron, 1 si alguno falló)
+        """
+        codigo = 0
+        for numero, linea in enumerate(lineas, 1):
+            if not linea.strip() or linea.lstrip().startswith('#'):
+                continue
+            op = None
+            try:
+                comando = self.interpretar_comando(linea)
+                op = comando['op']
+                respuesta = {'linea': numero, 'op': op, 'ok': True, 'resultado': self.ejecutar_comando(comando)}
+            except KeyError as e:
+                respuesta = {'linea': numero, 'op': op, 'ok': False, 'error': f"Falta el argumento {e}"}
+            except (ValueError, TypeError) as e:
+                respuesta = {'linea': numero, 'op': op, 'ok': False, 'error': str(e)}
+            except OSError as e:
+                # El WAL no se pudo escribir: el cambio no se aplicó
+                respuesta = {'linea': numero, 'op': op, 'ok': False,
+                             'error': f"No se pudo registrar el cambio en el disco: {e}"}
+            except sqlite3.Error as e:
+                respuesta = {'linea': numero, 'op': op, 'ok': False, 'error': f"Error en la base de datos: {e}"}
+            salida.write(json.dumps(respuesta, ensure_ascii=False) + "\n")
+            if not respuesta['ok']:
+                codigo = 1
+                if detener_en_error:
+                    break
+        return codigo
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sistema de inventario. Sin comandos se inicia el menú interactivo; con comandos se "
+                    "ejecutan sin pedir datos y se escribe un resultado JSON por línea.",
+        epilog="Comandos: " + "; ".join(f"{op} {' '.join(argumentos)}".strip()
+                                       for op, argumentos in SistemaInventario.ARGUMENTOS_COMANDOS.items()))
+    parser.add_argument("comando", nargs="*", help="un comando con sus argumentos, por ejemplo: add Pan 10 2.5")
+    parser.add_argument("--archivo", default="inventario.json", help="archivo del inventario")
+    parser.add_argument("--backend", choices=["json", "sqlite"],
+                        help="almacenamiento del inventario (por defecto, SQLite si el archivo termina en .db)")
+    parser.add_argument("-c", "--ejecutar", action="append", default=[], metavar="COMANDO",
+                        help="comando completo entre comillas (se puede repetir)")
+    parser.add_argument("--script", help="archivo con un comando por línea, o - para la entrada estándar")
+    parser.add_argument("--detener-en-error", action="store_true", help="no ejecuta más comandos después de un error")
+    args = parser.parse_args()
+    
+    if not (args.comando or args.ejecutar or args.script):
+        # Iniciar el sistema
+        sistema = SistemaInventario(args.archivo, backend=args.backend)
+        sistema.ejecutar()
+        return
+    
+    if args.comando and args.comando[0] not in SistemaInventario.ARGUMENTOS_COMANDOS:
+        parser.error(f"comando desconocido: {args.comando[0]}")
+    
+    # Los mensajes del inventario van a stderr para que la salida estándar solo tenga JSON
+    salida = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        sistema = SistemaInventario(args.archivo, backend=args.backend)
+        lineas = list(args.ejecutar)
+        if args.comando:
+            lineas.append(shlex.join(args.comando))
+        codigo = sistema.ejecutar_comandos(lineas, salida, args.detener_en_error)
+        if args.script and not (codigo and args.detener_en_error):
+            try:
+                script = sys.stdin if args.script == "-" else open(args.script, 'r', encoding='utf-8')
+            except OSError as e:
+                print(f"Error: no se pudo abrir el script: {e}")
+                sys.exit(2)
+            with script:
+                codigo = sistema.ejecutar_comandos(script, salida, args.detener_en_error) or codigo
+    sys.exit(codigo)
 
 
 if __name__ == "__main__":
-    # Iniciar el sistema
-    sistema = SistemaInventario()
-    sistema.ejecutar()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# Palabras para generar nombres de productos sintéticos
+PALABRAS = ["arroz", "azucar", "leche", "queso", "pan", "harina", "aceite", "atun", "cafe", "te",
+            "galleta", "jabon", "fideo", "sal", "avena", "yogur", "jugo", "agua", "huevo", "pollo"]
+MARCAS = ["norte", "sol", "andino", "costa", "valle", "premium", "casero", "real"]
+
+
+class Cliente:
+    # Conexión HTTP/1.1 persistente (keep-alive) contra el servidor de semana11
+
+    def __init__(self, host: str, puerto: int):
+        self.host = host
+        self.puerto = puerto
+        self.lector = None
+        self.escritor = None
+
+    async def conectar(self):
+        self.lector, self.escritor = await asyncio.open_connection(self.host, self.puerto)
+
+    async def pedir(self, metodo: str, ruta: str, cuerpo=None):
+        # Envía una petición y devuelve (código, respuesta JSON)
+        datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+        self.escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(datos)}\r\n\r\n".encode("latin-1")
+                            + datos)
+        await self.escritor.drain()
+        encabezado = (await self.lector.readuntil(b"\r\n\r\n")).decode("latin-1")
+        codigo = int(encabezado.split(" ", 2)[1])
+        longitud = 0
+        for linea in encabezado.split("\r\n")[1:]:
+            if linea.lower().startswith("content-length:"):
+                longitud = int(linea.split(":", 1)[1])
+        return codigo, json.loads(await self.lector.readexactly(longitud)) if longitud else None
+
+    async def cerrar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+
+
+def percentil(valores: list, p: float) -> float:
+    # Percentil por el método del rango más cercano sobre una lista ya ordenada
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, max(0, round(p / 100 * len(valores)) - 1))]
+
+
+async def trabajador(cliente: Cliente, ids: list, fin: float, proporcion_escrituras: float,
+                     aleatorio: random.Random, latencias: list, errores: list):
+    # Envía peticiones hasta el momento fin: escrituras (altas y cambios de cantidad) y
+    # lecturas (consulta por ID, búsqueda y listado)
+    while time.perf_counter() < fin:
+        if aleatorio.random() < proporcion_escrituras or not ids:
+            if aleatorio.random() < 0.5 or not ids:
+                peticion = ("POST", "/productos", {
+                    'nombre': f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 9999)}",
+                    'cantidad': aleatorio.randint(0, 500), 'precio': round(aleatorio.uniform(0.1, 100), 2)})
+            else:
+                peticion = ("PATCH", f"/productos/{aleatorio.choice(ids)}", {'cantidad': aleatorio.randint(0, 500)})
+        else:
+            tipo = aleatorio.random()
+            if tipo < 0.6:
+                peticion = ("GET", f"/productos/{aleatorio.choice(ids)}", None)
+            elif tipo < 0.9:
+                peticion = ("GET", f"/buscar?q={aleatorio.choice(PALABRAS)}&limite=20", None)
+            else:
+                peticion = ("GET", "/productos?limite=20&orden=precio", None)
+        inicio = time.perf_counter()
+        codigo, respuesta = await cliente.pedir(*peticion)
+        latencias.append(time.perf_counter() - inicio)
+        if codigo >= 400:
+            errores.append((peticion[0], peticion[1], codigo))
+        elif peticion[0] == "POST":
+            ids.append(respuesta['id'])
+
+
+async def ejecutar(args) -> dict:
+    aleatorio = random.Random(args.semilla)
+    clientes = [Cliente(args.host, args.puerto) for _ in range(args.concurrencia)]
+    await asyncio.gather(*(cliente.conectar() for cliente in clientes))
+
+    # IDs existentes para las lecturas y los cambios de cantidad
+    codigo, pagina = await clientes[0].pedir("GET", "/productos?limite=1000")
+    ids = [producto['id'] for producto in pagina['productos']] if codigo == 200 else []
+
+    latencias = []
+    errores = []
+    inicio = time.perf_counter()
+    fin = inicio + args.duracion
+    await asyncio.gather(*(trabajador(cliente, ids, fin, args.escrituras, random.Random(aleatorio.random()),
+                                      latencias, errores) for cliente in clientes))
+    transcurrido = time.perf_counter() - inicio
+    await asyncio.gather(*(cliente.cerrar() for cliente in clientes))
+
+    latencias.sort()
+    return {
+        'peticiones': len(latencias),
+        'errores': len(errores),
+        'segundos': round(transcurrido, 3),
+        'peticiones_por_segundo': round(len(latencias) / transcurrido, 1),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 3),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de semana11")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8011)
+    parser.add_argument("--concurrencia", type=int, default=16, help="conexiones simultáneas")
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--escrituras", type=float, default=0.2, help="proporción de peticiones que modifican datos")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    resultado = asyncio.run(ejecutar(args))
+    print(json.dumps(resultado, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
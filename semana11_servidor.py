@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import contextlib
+import ipaddress
+import json
+import signal
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from semana11 import Producto, SistemaInventario
+
+# Tamaño máximo de la línea de petición más los encabezados, y del cuerpo
+MAXIMO_ENCABEZADOS = 16 * 1024
+MAXIMO_CUERPO = 1024 * 1024
+MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ErrorHTTP(Exception):
+    # Error que se responde al cliente con el código y el mensaje indicados
+    def __init__(self, codigo: int, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class ServidorInventario:
+    # Servidor HTTP/JSON sobre un único inventario compartido.
+    # Las lecturas se atienden directamente en el bucle de eventos, sin esperar a nadie. Todas las
+    # escrituras pasan por una cola que consume una sola tarea escritora, así nunca hay dos cambios
+    # a la vez; como los cambios se aplican sin ceder el control, una lectura nunca ve uno a medias.
+    # La escritora guarda en disco por lotes: como mucho una vez cada intervalo_guardado segundos.
+    # Con el archivo JSON cada cambio se anota además en el WAL, que se sincroniza una vez por lote
+    # antes de responder: un cambio confirmado al cliente sobrevive a una interrupción. Si la
+    # sincronización falla, los cambios del lote se deshacen antes de informar el error.
+
+    def __init__(self, sistema: SistemaInventario, intervalo_guardado: float = 1.0, maximo_lote: int = 1000):
+        self.sistema = sistema
+        self.intervalo_guardado = intervalo_guardado
+        self.maximo_lote = maximo_lote
+        self.cola = None  # Se crea dentro del bucle de eventos
+        self.pendientes_de_guardar = 0
+        self.ultimo_guardado = time.monotonic()
+        self.escritora = None
+        self.guardado_en_curso = None  # Guardado que corre en otro hilo, si lo hay
+        self.error_wal = None  # Error que impidió deshacer un lote en el WAL; ya no se aceptan cambios
+
+    async def escribir(self, comando: dict):
+        # Encola un cambio para la tarea escritora y espera su resultado
+        if self.error_wal is not None:
+            raise ErrorHTTP(503, f"No se aceptan cambios: el registro de cambios falló ({self.error_wal})")
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((comando, futuro))
+        return await futuro
+
+    async def tarea_escritora(self):
+        while True:
+            espera = None
+            if self.pendientes_de_guardar:
+                espera = max(self.intervalo_guardado - (time.monotonic() - self.ultimo_guardado), 0)
+            try:
+                lote = [await asyncio.wait_for(self.cola.get(), espera)]
+            except asyncio.TimeoutError:
+                await self.guardar_periodico()
+                continue
+            # Se toman todos los cambios que ya esperan, para aplicarlos y guardarlos juntos
+            while len(lote) < self.maximo_lote and not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+            resultados = []
+            # Cambios del lote que dependen de la sincronización del WAL: (posición en resultados,
+            # id, producto antes del cambio o None), y tamaño del WAL antes del primero de ellos
+            aplicados = []
+            longitud_wal = self.longitud_wal()
+            for comando, futuro in lote:
+                try:
+                    if comando['op'] == 'save':
+                        resultados.append((futuro, await self.guardar(), None))
+                        # Lo aplicado hasta aquí ya está en el archivo: no depende del WAL
+                        aplicados.clear()
+                        longitud_wal = self.longitud_wal()
+                    else:
+                        previo = self.producto_previo(comando)
+                        resultado = self.aplicar(comando)
+                        aplicados.append((len(resultados), resultado['id'], previo))
+                        resultados.append((futuro, resultado, None))
+                        self.pendientes_de_guardar += 1
+                except Exception as e:
+                    resultados.append((futuro, None, e))
+            try:
+                if self.sistema.backend == "json":
+                    self.sistema.inventario.sincronizar_wal()
+            except OSError as e:
+                # Los cambios no llegaron al disco: se deshacen, así el error que recibe cada cliente es cierto
+                self.deshacer(aplicados, longitud_wal)
+                for indice, _, _ in aplicados:
+                    resultados[indice] = (resultados[indice][0], None, e)
+            for futuro, resultado, error in resultados:
+                if futuro.cancelled():
+                    continue
+                if error is not None:
+                    futuro.set_exception(error)
+                else:
+                    futuro.set_result(resultado)
+            if time.monotonic() - self.ultimo_guardado >= self.intervalo_guardado:
+                await self.guardar_periodico()
+
+    def longitud_wal(self):
+        # Tamaño del WAL, para poder quitar los registros de un lote que se deshace (None sin WAL)
+        if self.sistema.backend != "json":
+            return None
+        return self.sistema.inventario.longitud_wal()
+
+    def producto_previo(self, comando: dict):
+        # Estado del producto que va a cambiar, para poder deshacer el cambio (None si no existe)
+        if self.sistema.backend != "json":
+            return None
+        producto = self.sistema.inventario.obtener_producto(comando.get('id'))
+        return producto.to_dict() if producto is not None else None
+
+    def deshacer(self, aplicados: list, longitud_wal):
+        # Deshace en orden inverso los cambios de un lote y quita sus registros del WAL, para que
+        # no se rehagan al reiniciar. Si no se pueden quitar, se dejan de aceptar cambios.
+        inventario = self.sistema.inventario
+        with inventario.wal_suspendido():
+            for _, id, previo in reversed(aplicados):
+                if previo is None:
+                    inventario.aplicar_registro({'op': 'del', 'id': id})
+                else:
+                    inventario.aplicar_registro({'op': 'put', 'producto': previo})
+        try:
+            inventario.recortar_wal(longitud_wal)
+        except OSError as e:
+            self.error_wal = e
+            print(f"Error: no se pudo deshacer el lote en el WAL ({e}); el servidor ya no acepta cambios")
+
+    def aplicar(self, comando: dict):
+        # Aplica un cambio; las modificaciones de varios campos se validan antes de tocar el producto
+        if comando['op'] != 'patch':
+            return self.sistema.ejecutar_comando(comando)
+        producto = self.sistema.inventario.obtener_producto(comando['id'])
+        if producto is None:
+            raise ErrorHTTP(404, f"No existe el producto {comando['id']}")
+        prueba = Producto(producto.id, producto.nombre, producto.cantidad, producto.precio)
+        cambios = comando['cambios']
+        if 'cantidad' in cambios:
+            prueba.cantidad = SistemaInventario.convertir_numero(cambios, 'cantidad', int)
+        if 'precio' in cambios:
+            prueba.precio = SistemaInventario.convertir_numero(cambios, 'precio', float)
+        if 'nombre' in cambios:
+            prueba.nombre = str(cambios['nombre'])
+        for campo in ('nombre', 'cantidad', 'precio'):
+            if campo in cambios and getattr(producto, campo) != getattr(prueba, campo):
+                setattr(producto, campo, getattr(prueba, campo))
+        return producto.to_dict()
+
+    async def guardar(self):
+        # Guarda los cambios acumulados. Con el archivo JSON se escribe en otro hilo para no
+        # detener las lecturas; la escritora espera, así que nadie modifica el inventario mientras tanto.
+        # SQLite no permite usar la conexión desde otro hilo, pero confirmar es rápido.
+        try:
+            if not self.pendientes_de_guardar:
+                return {'archivo': self.sistema.ruta_archivo}
+            if self.sistema.backend == "json":
+                # Si se cancela la escritora, el hilo sigue escribiendo: el futuro queda guardado para
+                # que servir() espere a que termine antes del último guardado
+                self.guardado_en_curso = asyncio.ensure_future(
+                    asyncio.to_thread(self.sistema.ejecutar_comando, {'op': 'save'}))
+                guardado = await asyncio.shield(self.guardado_en_curso)
+            else:
+                guardado = self.sistema.ejecutar_comando({'op': 'save'})
+            self.pendientes_de_guardar = 0
+            return guardado
+        finally:
+            self.ultimo_guardado = time.monotonic()
+
+    async def guardar_periodico(self):
+        # Guardado por lotes de la escritora: si falla, los cambios siguen pendientes y se reintenta después
+        try:
+            await self.guardar()
+        except ValueError as e:
+            print(f"Error: {e}")
+
+    async def atender(self, metodo: str, ruta: str, consulta: dict, cuerpo):
+        # Devuelve (código, respuesta) para una petición
+        partes = [unquote(parte) for parte in ruta.strip("/").split("/") if parte]
+        inventario = self.sistema.inventario
+
+        if partes == ["productos"]:
+            if metodo == "GET":
+                cursor = self.parametro(consulta, "cursor")
+                comando = {'op': 'list', 'orden': self.parametro(consulta, "orden"),
+                           'limite': self.parametro(consulta, "limite", "50")}
+                if cursor:
+                    comando['cursor'] = json.loads(cursor)
+                return 200, self.sistema.ejecutar_comando(comando)
+            if metodo == "POST":
+                return 201, await self.escribir({**self.exigir_objeto(cuerpo), 'op': 'add'})
+            raise ErrorHTTP(405, "Use GET o POST")
+
+        if len(partes) == 2 and partes[0] == "productos":
+            id = partes[1]
+            if metodo == "GET":
+                producto = inventario.obtener_producto(id)
+                if producto is None:
+                    raise ErrorHTTP(404, f"No existe el producto {id}")
+                return 200, producto.to_dict()
+            if metodo in ("PATCH", "PUT"):
+                return 200, await self.escribir({'op': 'patch', 'id': id, 'cambios': self.exigir_objeto(cuerpo)})
+            if metodo == "DELETE":
+                try:
+                    return 200, await self.escribir({'op': 'delete', 'id': id})
+                except ValueError as e:
+                    raise ErrorHTTP(404, str(e))
+            raise ErrorHTTP(405, "Use GET, PATCH o DELETE")
+
+        if partes == ["buscar"] and metodo == "GET":
+            return 200, self.sistema.ejecutar_comando({'op': 'search', 'texto': self.parametro(consulta, "q", ""),
+                                                        'limite': self.parametro(consulta, "limite", "50")})
+        if partes == ["resumen"] and metodo == "GET":
+            return 200, inventario.resumen()
+        if partes == ["guardar"] and metodo == "POST":
+            # Pasa por la cola para que se guarde después de los cambios que ya estaban encolados
+            return 200, await self.escribir({'op': 'save'})
+        raise ErrorHTTP(404, f"No existe la ruta {metodo} {ruta}")
+
+    @staticmethod
+    def parametro(consulta: dict, nombre: str, defecto=None):
+        # Primer valor de un parámetro de la URL
+        return consulta.get(nombre, [defecto])[0]
+
+    @staticmethod
+    def exigir_objeto(cuerpo) -> dict:
+        if not isinstance(cuerpo, dict):
+            raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON")
+        return cuerpo
+
+    async def conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        # Atiende las peticiones de una conexión; se mantiene abierta (keep-alive) salvo que se pida cerrarla
+        try:
+            while True:
+                try:
+                    encabezado = await lector.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    await self.responder(escritor, 413, {'error': "Encabezados demasiado grandes"}, False)
+                    return
+                lineas = encabezado.decode("latin-1").split("\r\n")
+                try:
+                    metodo, destino, version = lineas[0].split(" ", 2)
+                except ValueError:
+                    await self.responder(escritor, 400, {'error': "Petición inválida"}, False)
+                    return
+                encabezados = {}
+                for linea in lineas[1:]:
+                    if ":" in linea:
+                        nombre, valor = linea.split(":", 1)
+                        encabezados[nombre.strip().lower()] = valor.strip()
+                seguir = (encabezados.get("connection", "").lower() != "close" and version == "HTTP/1.1")
+
+                try:
+                    longitud = int(encabezados.get("content-length", "0") or 0)
+                except ValueError:
+                    await self.responder(escritor, 400, {'error': "Content-Length inválido"}, False)
+                    return
+                if longitud > MAXIMO_CUERPO:
+                    await self.responder(escritor, 413, {'error': "Cuerpo demasiado grande"}, False)
+                    return
+                datos = await lector.readexactly(longitud) if longitud else b""
+
+                url = urlsplit(destino)
+                try:
+                    cuerpo = json.loads(datos) if datos else None
+                    codigo, respuesta = await self.atender(metodo.upper(), url.path, parse_qs(url.query), cuerpo)
+                except ErrorHTTP as e:
+                    codigo, respuesta = e.codigo, {'error': str(e)}
+                except KeyError as e:
+                    codigo, respuesta = 400, {'error': f"Falta el campo {e}"}
+                except (ValueError, TypeError) as e:
+                    codigo, respuesta = 400, {'error': str(e)}
+                except Exception as e:
+                    codigo, respuesta = 500, {'error': f"Error interno: {e}"}
+                await self.responder(escritor, codigo, respuesta, seguir)
+                if not seguir:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def responder(escritor: asyncio.StreamWriter, codigo: int, respuesta, seguir: bool):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+        escritor.write(
+            f"HTTP/1.1 {codigo} {MOTIVOS.get(codigo, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n".encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+    async def servir(self, host: str, puerto: int):
+        self.cola = asyncio.Queue()
+        self.escritora = asyncio.create_task(self.tarea_escritora())
+        servidor = await asyncio.start_server(self.conexion, host, puerto, limit=MAXIMO_ENCABEZADOS)
+        print(f"Inventario disponible en http://{host}:{puerto}/ (Ctrl+C para detener)")
+        try:
+            # Con SIGTERM también se detiene guardando los cambios, como con Ctrl+C
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass  # Windows no admite manejadores de señales en el bucle de eventos
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.escritora.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.escritora
+            if self.guardado_en_curso is not None and not self.guardado_en_curso.done():
+                # Dos guardados a la vez escribirían el mismo archivo temporal
+                with contextlib.suppress(Exception):
+                    await self.guardado_en_curso
+            # Los cambios ya aplicados se guardan antes de salir
+            await self.guardar()
+
+
+def es_local(host: str) -> bool:
+    # Solo se aceptan direcciones de loopback: el servidor no tiene autenticación
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON local para el inventario de semana11")
+    parser.add_argument("--archivo", default="inventario.json", help="archivo del inventario (.db para SQLite)")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección de loopback donde escuchar")
+    parser.add_argument("--puerto", type=int, default=8011)
+    parser.add_argument("--intervalo-guardado", type=float, default=1.0,
+                        help="segundos máximos entre un cambio y su escritura en disco")
+    args = parser.parse_args()
+    if not es_local(args.host):
+        parser.error("el servidor solo puede escuchar en localhost")
+
+    servidor = ServidorInventario(SistemaInventario(args.archivo, fsync_wal="lote"), args.intervalo_guardado)
+    try:
+        asyncio.run(servidor.servir(args.host, args.puerto))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nServidor detenido.")
+
+
+if __name__ == "__main__":
+    main()
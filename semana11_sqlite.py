@@ -0,0 +1,591 @@
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+
+from semana11 import GeneradorIds, Inventario, Producto, TAMANO_PAGINA, NIVEL_REPOSICION, LIMITES_BANDAS_PRECIO
+
+# Columnas de la tabla de productos, en el orden en que se leen para crear un Producto
+COLUMNAS = "id, nombre, cantidad, precio"
+# Columnas por las que se puede ordenar o consultar por rango, con su expresión de orden
+ORDENES = {
+    'id': ('id',),
+    'nombre': ('nombre_lower', 'id'),
+    'precio': ('precio', 'id'),
+    'cantidad': ('cantidad', 'id'),
+}
+# Máximo de parámetros por consulta con IN (...)
+PARAMETROS_POR_CONSULTA = 500
+
+
+class InventarioSQLite:
+    """Inventario guardado en una base de datos SQLite, con los mismos métodos que Inventario
+    
+    Los productos no se cargan en memoria: cada consulta usa los índices de la base de datos.
+    Cada cambio se confirma (COMMIT) en cuanto se hace, así que no se pierde si el programa
+    termina sin guardar y el bloqueo de escritura se suelta enseguida para otros procesos;
+    las cargas en bloque van en una sola transacción (ver transaccion). La base usa el modo
+    WAL, así las lecturas de otros procesos no esperan a las escrituras.
+    """
+    
+    def __init__(self, ruta_db="inventario.db", nodo_id=None):
+        """Constructor de la clase InventarioSQLite
+        
+        Args:
+            ruta_db (str): Ruta del archivo de base de datos (se crea si no existe)
+            nodo_id (int): Número de nodo para el generador de IDs (ver GeneradorIds)
+        """
+        self.ruta_db = ruta_db
+        # Sin transacción implícita: cada sentencia fuera de transaccion() se confirma sola
+        self._conexion = sqlite3.connect(ruta_db, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL solo puede perder la última transacción ante un corte de energía
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._generador_ids = GeneradorIds(nodo_id)
+        self._aviso_cambios = self.producto_modificado
+        self.crear_tablas()
+    
+    @contextlib.contextmanager
+    def transaccion(self):
+        """Ejecuta las sentencias del bloque en una sola transacción
+        
+        Se confirma al salir del bloque y se deshace si el bloque lanza una excepción.
+        """
+        self._conexion.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conexion.execute("ROLLBACK")
+            raise
+        self._conexion.execute("COMMIT")
+    
+    def crear_tablas(self):
+        """Crea la tabla de productos, sus índices y, si está disponible, el índice FTS5"""
+        with self.transaccion():
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS productos ("
+                "id TEXT PRIMARY KEY, nombre TEXT NOT NULL, nombre_lower TEXT NOT NULL, "
+                "cantidad INTEGER NOT NULL, precio REAL NOT NULL)")
+            # El ID va en cada índice para que las páginas y los empates sigan el mismo orden que Inventario
+            self._conexion.execute("CREATE INDEX IF NOT EXISTS productos_nombre ON productos (nombre_lower, id)")
+            self._conexion.execute("CREATE INDEX IF NOT EXISTS productos_precio ON productos (precio, id)")
+            self._conexion.execute("CREATE INDEX IF NOT EXISTS productos_cantidad ON productos (cantidad, id)")
+        self.usa_fts = self.crear_indice_fts()
+    
+    def crear_indice_fts(self):
+        """Crea el índice de texto completo con trigramas para buscar subcadenas
+        
+        Requiere SQLite compilado con FTS5 y la versión 3.34 o posterior (tokenizador trigram).
+        
+        Returns:
+            bool: True si el índice está disponible, False si hay que buscar recorriendo la tabla
+        """
+        existia = self._conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'productos_fts'").fetchone() is not None
+        try:
+            with self.transaccion():
+                self._conexion.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5("
+                    "nombre_lower, content='productos', content_rowid='rowid', tokenize='trigram')")
+                # Los disparadores mantienen el índice al día con cada cambio de la tabla
+                self._conexion.execute(
+                    "CREATE TRIGGER IF NOT EXISTS productos_fts_alta AFTER INSERT ON productos BEGIN "
+                    "INSERT INTO productos_fts (rowid, nombre_lower) VALUES (new.rowid, new.nombre_lower); END")
+                self._conexion.execute(
+                    "CREATE TRIGGER IF NOT EXISTS productos_fts_baja AFTER DELETE ON productos BEGIN "
+                    "INSERT INTO productos_fts (productos_fts, rowid, nombre_lower) "
+                    "VALUES ('delete', old.rowid, old.nombre_lower); END")
+                self._conexion.execute(
+                    "CREATE TRIGGER IF NOT EXISTS productos_fts_cambio AFTER UPDATE OF nombre_lower ON productos BEGIN "
+                    "INSERT INTO productos_fts (productos_fts, rowid, nombre_lower) "
+                    "VALUES ('delete', old.rowid, old.nombre_lower); "
+                    "INSERT INTO productos_fts (rowid, nombre_lower) VALUES (new.rowid, new.nombre_lower); END")
+                if not existia:
+                    # La tabla pudo haberse llenado sin el índice (por ejemplo, con otra versión de SQLite)
+                    self._conexion.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError:
+            return False
+    
+    def crear_producto(self, fila):
+        """Crea un Producto a partir de una fila (id, nombre, cantidad, precio)
+        
+        El producto avisa sus cambios a este inventario, que los escribe en la base de datos.
+        """
+        producto = Producto(*fila)
+        producto._observador = self._aviso_cambios
+        return producto
+    
+    def producto_modificado(self, producto, campo, valor_anterior):
+        """Escribe en la base de datos el cambio de un atributo de un producto
+        
+        Args:
+            producto (Producto): Producto que cambió
+            campo (str): Atributo que cambió
+            valor_anterior: Valor que tenía antes del cambio
+        """
+        try:
+            if campo == 'nombre':
+                self._conexion.execute("UPDATE productos SET nombre = ?, nombre_lower = ? WHERE id = ?",
+                                       (producto.nombre, producto.nombre.lower(), producto.id))
+            elif campo == 'cantidad':
+                self._conexion.execute("UPDATE productos SET cantidad = ? WHERE id = ?", (producto.cantidad, producto.id))
+            elif campo == 'precio':
+                self._conexion.execute("UPDATE productos SET precio = ? WHERE id = ?", (producto.precio, producto.id))
+        except sqlite3.Error:
+            # La base no cambió (por ejemplo, porque otro proceso la tiene bloqueada): el producto
+            # vuelve a su valor anterior para seguir coincidiendo con ella
+            setattr(producto, '_' + campo, valor_anterior)
+            raise
+    
+    def agregar_producto(self, producto):
+        """Agrega un nuevo producto al inventario
+        
+        Args:
+            producto (Producto): Producto a agregar
+        
+        Returns:
+            bool: True si se agregó exitosamente, False si el ID ya existe
+        """
+        try:
+            self._conexion.execute(
+                "INSERT INTO productos (id, nombre, nombre_lower, cantidad, precio) VALUES (?, ?, ?, ?, ?)",
+                (producto.id, producto.nombre, producto.nombre.lower(), producto.cantidad, producto.precio))
+        except sqlite3.IntegrityError:
+            return False
+        producto._observador = self._aviso_cambios
+        return True
+    
+    def ids_existentes(self, ids):
+        """Obtiene cuáles de los IDs dados ya están en la base de datos
+        
+        Args:
+            ids (list): IDs a comprobar
+        
+        Returns:
+            set: IDs que ya existen
+        """
+        existentes = set()
+        for inicio in range(0, len(ids), PARAMETROS_POR_CONSULTA):
+            tramo = ids[inicio:inicio + PARAMETROS_POR_CONSULTA]
+            consulta = f"SELECT id FROM productos WHERE id IN ({', '.join('?' * len(tramo))})"
+            existentes.update(id for id, in self._conexion.execute(consulta, tramo))
+        return existentes
+    
+    def agregar_en_bloque(self, productos):
+        """Agrega muchos productos de una vez con una sola sentencia preparada
+        
+        Args:
+            productos (list): Productos a agregar
+        
+        Returns:
+            list: Productos rechazados porque su ID ya existía (en el inventario o repetido en el lote)
+        """
+        nuevos = {}
+        rechazados = []
+        for producto in productos:
+            if producto.id in nuevos:
+                rechazados.append(producto)
+            else:
+                nuevos[producto.id] = producto
+        existentes = self.ids_existentes(list(nuevos))
+        for id in existentes:
+            rechazados.append(nuevos.pop(id))
+        
+        with self.transaccion():
+            self._conexion.executemany(
+                "INSERT INTO productos (id, nombre, nombre_lower, cantidad, precio) VALUES (?, ?, ?, ?, ?)",
+                ((p.id, p.nombre, p.nombre.lower(), p.cantidad, p.precio) for p in nuevos.values()))
+        for producto in nuevos.values():
+            producto._observador = self._aviso_cambios
+        return rechazados
+    
+    def eliminar_producto(self, id):
+        """Elimina un producto del inventario
+        
+        Args:
+            id (str): ID del producto a eliminar
+        
+        Returns:
+            bool: True si se eliminó exitosamente, False si no se encontró
+        """
+        return self._conexion.execute("DELETE FROM productos WHERE id = ?", (id,)).rowcount > 0
+    
+    def actualizar_cantidad(self, id, nueva_cantidad):
+        """Actualiza la cantidad de un producto
+        
+        Args:
+            id (str): ID del producto a actualizar
+            nueva_cantidad (int): Nueva cantidad del producto
+        
+        Returns:
+            bool: True si se actualizó correctamente, False si no se encontró
+        """
+        producto = self.obtener_producto(id)
+        if producto is None:
+            return False
+        
+        try:
+            producto.cantidad = nueva_cantidad
+            return True
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+    
+    def actualizar_precio(self, id, nuevo_precio):
+        """Actualiza el precio de un producto
+        
+        Args:
+            id (str): ID del producto a actualizar
+            nuevo_precio (float): Nuevo precio del producto
+        
+        Returns:
+            bool: True si se actualizó correctamente, False si no se encontró
+        """
+        producto = self.obtener_producto(id)
+        if producto is None:
+            return False
+        
+        try:
+            producto.precio = nuevo_precio
+            return True
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+    
+    def buscar_por_nombre(self, nombre, limite=None):
+        """Busca productos por nombre
+        
+        Los resultados se ordenan igual que en Inventario: primero las coincidencias exactas,
+        luego los nombres que empiezan con el texto buscado y después el resto, en orden alfabético.
+        
+        Args:
+            nombre (str): Nombre o parte del nombre a buscar
+            limite (int): Cantidad máxima de productos a devolver (None para todos)
+        
+        Returns:
+            list: Lista de productos que coinciden con la búsqueda
+        """
+        nombre_lower = nombre.lower()
+        orden = ("ORDER BY p.nombre_lower <> ?, substr(p.nombre_lower, 1, ?) <> ?, p.nombre_lower, p.id LIMIT ?")
+        parametros_orden = (nombre_lower, len(nombre_lower), nombre_lower, -1 if limite is None else limite)
+        
+        if self.usa_fts and len(nombre_lower) >= 3:
+            # Con el tokenizador trigram, una frase entre comillas coincide con cualquier subcadena
+            frase = '"' + nombre_lower.replace('"', '""') + '"'
+            consulta = (f"SELECT p.id, p.nombre, p.cantidad, p.precio FROM productos_fts f "
+                        f"JOIN productos p ON p.rowid = f.rowid WHERE productos_fts MATCH ? {orden}")
+            filas = self._conexion.execute(consulta, (frase, *parametros_orden))
+        else:
+            # Sin FTS5, o con menos de 3 caracteres (no hay trigramas), se recorre la tabla
+            consulta = (f"SELECT p.id, p.nombre, p.cantidad, p.precio FROM productos p "
+                        f"WHERE instr(p.nombre_lower, ?) > 0 {orden}")
+            filas = self._conexion.execute(consulta, (nombre_lower, *parametros_orden))
+        return [self.crear_producto(fila) for fila in filas]
+    
+    def obtener_producto(self, id):
+        """Obtiene un producto por su ID
+        
+        Args:
+            id (str): ID del producto
+        
+        Returns:
+            Producto: Producto encontrado o None si no existe
+        """
+        fila = self._conexion.execute(f"SELECT {COLUMNAS} FROM productos WHERE id = ?", (id,)).fetchone()
+        return self.crear_producto(fila) if fila else None
+    
+    def listar_productos(self):
+        """Obtiene todos los productos del inventario
+        
+        Returns:
+            list: Lista de todos los productos
+        """
+        return list(self.iterar_productos())
+    
+    def paginar(self, tamano_pagina=TAMANO_PAGINA, orden='id', cursor=None):
+        """Obtiene una página de productos ordenados, a partir de un cursor
+        
+        El cursor tiene el mismo formato que en Inventario.paginar; cada página es una
+        consulta que recorre el índice de la columna desde el cursor.
+        
+        Args:
+            tamano_pagina (int): Máximo de productos por página
+            orden (str): 'id', 'nombre', 'precio' o 'cantidad'
+            cursor (tuple): Cursor devuelto por la página anterior (None para la primera)
+        
+        Returns:
+            tuple: (lista de productos de la página, cursor de la página siguiente o None si no hay más)
+        """
+        if tamano_pagina < 1:
+            raise ValueError("El tamaño de página debe ser al menos 1")
+        if orden not in ORDENES:
+            raise ValueError(f"Orden desconocido: {orden}")
+        columnas = ORDENES[orden]
+        lista_columnas = ", ".join(columnas)
+        condicion = ""
+        parametros = []
+        if cursor is not None:
+            condicion = f"WHERE ({lista_columnas}) > ({', '.join('?' * len(columnas))})"
+            parametros.extend(cursor)
+        consulta = (f"SELECT {COLUMNAS}, {lista_columnas} FROM productos {condicion} "
+                    f"ORDER BY {lista_columnas} LIMIT ?")
+        # Se pide uno más para saber si existe una página siguiente
+        filas = self._conexion.execute(consulta, (*parametros, tamano_pagina + 1)).fetchall()
+        pagina = [self.crear_producto(fila[:4]) for fila in filas[:tamano_pagina]]
+        if len(filas) <= tamano_pagina:
+            return pagina, None
+        return pagina, tuple(filas[tamano_pagina - 1][4:])
+    
+    def iterar_productos(self, orden=None, tamano_pagina=1000):
+        """Recorre los productos sin cargarlos todos en memoria
+        
+        Args:
+            orden (str): None, 'id', 'nombre', 'precio' o 'cantidad'
+            tamano_pagina (int): Productos que se leen por vez cuando se indica un orden
+        
+        Yields:
+            Producto: Cada producto del inventario
+        """
+        if orden is None:
+            for fila in self._conexion.execute(f"SELECT {COLUMNAS} FROM productos ORDER BY rowid"):
+                yield self.crear_producto(fila)
+            return
+        cursor = None
+        while True:
+            pagina, cursor = self.paginar(tamano_pagina, orden, cursor)
+            yield from pagina
+            if cursor is None:
+                return
+    
+    def cantidad_productos(self):
+        """Obtiene la cantidad de productos del inventario
+        
+        Returns:
+            int: Número de productos
+        """
+        return self._conexion.execute("SELECT count(*) FROM productos").fetchone()[0]
+    
+    def productos_en_rango(self, campo, minimo=None, maximo=None, limite=None):
+        """Obtiene los productos cuyo campo está entre minimo y maximo (ambos incluidos)
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            minimo: Valor mínimo (None para no poner límite inferior)
+            maximo: Valor máximo (None para no poner límite superior)
+            limite (int): Máximo de productos a devolver
+        
+        Returns:
+            list: Productos ordenados por el campo, de menor a mayor
+        """
+        if campo not in Inventario.CAMPOS_ORDENADOS:
+            raise ValueError(f"No hay índice ordenado para {campo}")
+        condiciones = []
+        parametros = []
+        if minimo is not None:
+            condiciones.append(f"{campo} >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condiciones.append(f"{campo} <= ?")
+            parametros.append(maximo)
+        condicion = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+        consulta = f"SELECT {COLUMNAS} FROM productos {condicion} ORDER BY {campo}, id LIMIT ?"
+        filas = self._conexion.execute(consulta, (*parametros, -1 if limite is None else limite))
+        return [self.crear_producto(fila) for fila in filas]
+    
+    def mayores(self, campo, n):
+        """Obtiene los n productos con mayor valor en un campo
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            n (int): Número de productos
+        
+        Returns:
+            list: Productos de mayor a menor
+        """
+        if campo not in Inventario.CAMPOS_ORDENADOS:
+            raise ValueError(f"No hay índice ordenado para {campo}")
+        consulta = f"SELECT {COLUMNAS} FROM productos ORDER BY {campo} DESC, id DESC LIMIT ?"
+        return [self.crear_producto(fila) for fila in self._conexion.execute(consulta, (max(n, 0),))]
+    
+    def menores(self, campo, n):
+        """Obtiene los n productos con menor valor en un campo
+        
+        Args:
+            campo (str): 'cantidad' o 'precio'
+            n (int): Número de productos
+        
+        Returns:
+            list: Productos de menor a mayor
+        """
+        return self.productos_en_rango(campo, limite=max(n, 0))
+    
+    def productos_bajo_stock(self, nivel_reposicion=NIVEL_REPOSICION):
+        """Obtiene los productos cuya cantidad está por debajo del nivel de reposición
+        
+        Args:
+            nivel_reposicion (int): Cantidad mínima deseada
+        
+        Returns:
+            list: Productos ordenados de menor a mayor cantidad
+        """
+        consulta = f"SELECT {COLUMNAS} FROM productos WHERE cantidad < ? ORDER BY cantidad, id"
+        return [self.crear_producto(fila) for fila in self._conexion.execute(consulta, (nivel_reposicion,))]
+    
+    def resumen(self):
+        """Obtiene los totales del inventario con el mismo formato que Inventario.resumen
+        
+        Returns:
+            dict: Cantidad de productos, total de unidades, valor total del stock e
+                histograma por banda de precio (desde, hasta, productos y unidades)
+        """
+        productos, unidades, valor = self._conexion.execute(
+            "SELECT count(*), coalesce(sum(cantidad), 0), coalesce(sum(cantidad * precio), 0) FROM productos").fetchone()
+        # La banda de cada precio es la cantidad de límites menores o iguales a él, como en Inventario
+        banda = " + ".join(f"(precio >= {limite})" for limite in LIMITES_BANDAS_PRECIO)
+        por_banda = {fila[0]: fila[1:] for fila in self._conexion.execute(
+            f"SELECT {banda} AS banda, count(*), sum(cantidad) FROM productos GROUP BY banda")}
+        limites = (0, *LIMITES_BANDAS_PRECIO, None)
+        histograma = [{'desde': limites[i], 'hasta': limites[i + 1],
+                       'productos': por_banda.get(i, (0, 0))[0], 'unidades': por_banda.get(i, (0, 0))[1]}
+                      for i in range(len(limites) - 1)]
+        return {
+            'productos': productos,
+            'unidades': unidades,
+            'valor_total': round(valor, 2),
+            'histograma_precios': histograma,
+        }
+    
+    def generar_id(self):
+        """Genera un nuevo ID único para un producto
+        
+        Returns:
+            str: ID único generado
+        """
+        nuevo_id = self._generador_ids.siguiente()
+        while self._conexion.execute("SELECT 1 FROM productos WHERE id = ?", (nuevo_id,)).fetchone():
+            nuevo_id = self._generador_ids.siguiente()
+        return nuevo_id
+    
+    def reservar_ids(self, cantidad):
+        """Genera varios IDs únicos de una vez
+        
+        Args:
+            cantidad (int): Número de IDs a generar
+        
+        Returns:
+            list: IDs únicos generados
+        """
+        ids = self._generador_ids.reservar(cantidad)
+        if not ids:
+            return ids
+        # Los IDs reservados son crecientes: basta una consulta por rango para ver si alguno ya existe
+        usados = {id for id, in self._conexion.execute(
+            "SELECT id FROM productos WHERE id BETWEEN ? AND ?", (ids[0], ids[-1]))}
+        if usados:
+            ids = [id if id not in usados else self.generar_id() for id in ids]
+        return ids
+    
+    def hay_cambios(self):
+        """Indica si hay cambios sin guardar
+        
+        Returns:
+            bool: True si hay una transacción sin confirmar (solo durante una carga en bloque)
+        """
+        return self._conexion.in_transaction
+    
+    def guardar_cambios(self, ruta_archivo=None, umbral_delta=None):
+        """Confirma en la base de datos los cambios pendientes
+        
+        Cada cambio ya se confirma al hacerse, así que normalmente no queda nada por confirmar.
+        Los argumentos existen solo para tener la misma firma que Inventario.guardar_cambios.
+        
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        try:
+            if self._conexion.in_transaction:
+                self._conexion.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al guardar los cambios del inventario: {e}")
+            return False
+    
+    def guardar_en_archivo(self, ruta_archivo="inventario.json", formato="json"):
+        """Exporta el inventario a un archivo JSON o NDJSON
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo donde guardar
+            formato (str): "json" o "ndjson"
+        
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        try:
+            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
+                if formato == "ndjson":
+                    for producto in self.iterar_productos():
+                        archivo.write(json.dumps(producto.to_dict(), ensure_ascii=False) + "\n")
+                else:
+                    datos = {producto.id: producto.to_dict() for producto in self.iterar_productos()}
+                    json.dump(datos, archivo, indent=4, ensure_ascii=False)
+            return True
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error al guardar el inventario: {e}")
+            return False
+    
+    def cargar_desde_archivo(self, ruta_archivo="inventario.json"):
+        """Reemplaza el contenido de la base de datos con un archivo JSON o NDJSON de Inventario
+        
+        El archivo se lee con Inventario.cargar_desde_archivo, así que también se aplica su
+        archivo de diferencias. El reemplazo se confirma en una sola transacción: si falla, la
+        base de datos queda como estaba.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo desde donde cargar
+        
+        Returns:
+            bool: True si se cargó correctamente, False si hubo error
+        """
+        if not os.path.exists(ruta_archivo):
+            print(f"El archivo {ruta_archivo} no existe.")
+            return False
+        origen = Inventario()
+        if not origen.cargar_desde_archivo(ruta_archivo):
+            return False
+        try:
+            with self.transaccion():
+                self._conexion.execute("DELETE FROM productos")
+                self._conexion.executemany(
+                    "INSERT INTO productos (id, nombre, nombre_lower, cantidad, precio) VALUES (?, ?, ?, ?, ?)",
+                    ((p.id, p.nombre, p.nombre.lower(), p.cantidad, p.precio) for p in origen.iterar_productos()))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al cargar el inventario: {e}")
+            return False
+    
+    def cerrar(self):
+        """Confirma los cambios pendientes y cierra la conexión"""
+        if self._conexion.in_transaction:
+            self._conexion.execute("COMMIT")
+        self._conexion.close()
+
+
+def main():
+    # Migrador de una sola vez: convierte un inventario JSON/NDJSON de semana11 en una base SQLite
+    parser = argparse.ArgumentParser(description="Convierte un inventario JSON o NDJSON de semana11 a SQLite")
+    parser.add_argument("origen", help="archivo JSON o NDJSON del inventario (se aplica también su .delta)")
+    parser.add_argument("destino", help="archivo de base de datos SQLite a crear o reemplazar")
+    args = parser.parse_args()
+    
+    inventario = InventarioSQLite(args.destino)
+    if not inventario.cargar_desde_archivo(args.origen) or not inventario.guardar_cambios():
+        sys.exit(1)
+    print(f"Se migraron {inventario.cantidad_productos()} productos a '{args.destino}'.")
+    inventario.cerrar()
+
+
+if __name__ == "__main__":
+    main()